@@ -5,11 +5,42 @@ Contains:
     ====
     app_views - The blueprint to be used by routes, and
     registered to the flask app
+
+    Functions
+    =========
+    stream_list - Returns a response streaming a JSON list of objects
 """
-from flask import Blueprint
+from flask import Blueprint, current_app, stream_with_context
 
 app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
+
+def stream_list(objs):
+    """
+    Returns a response sending the JSON list of the dictionaries of the
+    objects generated by objs, as jsonify() does, but sending it while
+    the objects are generated instead of once they are all in memory
+    """
+    def generate():
+        """generates the JSON list by chunks of 100 objects"""
+        chunk = []
+        sep = "["
+        for obj in objs:
+            chunk.append(obj.to_dict())
+            if len(chunk) == 100:
+                yield sep + current_app.json.dumps(
+                    chunk, separators=(",", ":"))[1:-1]
+                chunk = []
+                sep = ","
+        if chunk:
+            yield sep + current_app.json.dumps(
+                chunk, separators=(",", ":"))[1:-1]
+            sep = ","
+        yield "[]\n" if sep == "[" else "]\n"
+    return current_app.response_class(stream_with_context(generate()),
+                                      mimetype=current_app.json.mimetype)
+
+
 from api.v1.views.amenities import *
 from api.v1.views.index import *
 from api.v1.views.cities import *
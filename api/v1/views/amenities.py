@@ -5,7 +5,7 @@ actions for Amenity objects
 """
 
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, stream_list
 from models import storage
 from models.amenity import Amenity
 
@@ -15,8 +15,7 @@ def get_all_amenities():
     """
     Retrieves the list of all Amenity objects
     """
-    all_amenities = storage.all(Amenity)
-    return (jsonify([amenity.to_dict() for amenity in all_amenities.values()]))
+    return (stream_list(storage.iter(Amenity)))
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'])
@@ -83,3 +82,50 @@ def update_amenity(amenity_id):
             setattr(am_obj, key, dct[key])
     storage.save()
     return (jsonify(am_obj.to_dict()), 200)
+
+
+@app_views.route("/amenities/batch", methods=["POST"])
+def create_amenities():
+    """
+    Route function of POST /api/v1/amenities/batch
+
+    Creates a new Amenity instance from each dictionary of the list in the
+    request body, and saves them all at once
+    """
+    try:
+        dcts = request.get_json()
+    except Exception:
+        return ("Not a JSON", 400)
+    if type(dcts) is not list or any(type(dct) is not dict for dct in dcts):
+        return ("Not a list", 400)
+    if any(dct.get("name") is None for dct in dcts):
+        return ("Missing name", 400)
+    new_amenities = [Amenity(**dct) for dct in dcts]
+    storage.bulk_new(new_amenities)
+    return (jsonify([amenity.to_dict() for amenity in new_amenities]), 201)
+
+
+@app_views.route("/amenities/batch", methods=["PUT"])
+def update_amenities():
+    """
+    Route function of PUT /api/v1/amenities/batch
+
+    Updates the Amenity instance of the ID of each dictionary of the list in
+    the request body, if they all exist, and saves them all at once
+    """
+    try:
+        dcts = request.get_json()
+    except Exception:
+        return ("Not a JSON", 400)
+    if type(dcts) is not list or any(type(dct) is not dict for dct in dcts):
+        return ("Not a list", 400)
+    if any(type(dct.get("id")) is not str for dct in dcts):
+        return ("Missing id", 400)
+    ids = [dct["id"] for dct in dcts]
+    if len(storage.get_many(Amenity, set(ids))) != len(set(ids)):
+        abort(404)
+    rows = [{key: dct[key] for key in dct.keys()
+             if key not in ["created_at", "updated_at"]} for dct in dcts]
+    storage.bulk_update(Amenity, rows)
+    amenities = storage.get_many(Amenity, ids)
+    return (jsonify([amenity.to_dict() for amenity in amenities]), 200)
@@ -18,7 +18,7 @@ def get_cities_by_state_id(state_id):
 
     Retrieves all City objects registered with a State of given ID
     """
-    state = storage.get(State, state_id)
+    state = storage.get(State, state_id, options={"cities": "joined"})
     if state is None:
         abort(404)
     cities = [city.to_dict() for city in state.cities]
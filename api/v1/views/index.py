@@ -8,11 +8,18 @@ Contains:
 
     stats - Route function for the /api/v1/stats url
 
+    pool_stats - Route function for the /api/v1/stats/pool url
+
+    cache_stats - Route function for the /api/v1/stats/cache url
+
+    object_cache_stats - Route function for the /api/v1/stats/cache/objects
+    url
+
 """
 
 from api.v1.views import app_views
-from flask import jsonify
-from models import storage
+from flask import abort, jsonify
+from models import storage, storage_t
 from models.amenity import Amenity
 from models.city import City
 from models.place import Place
@@ -44,7 +51,46 @@ def stats():
 
     Displays the number of objects of each class
     """
+    counts = storage.count_all()
     objs = {}
     for cls in classes.keys():
-        objs[cls] = storage.count(classes[cls])
+        objs[cls] = counts.get(classes[cls].__name__, 0)
     return (jsonify(objs))
+
+
+@app_views.route("/stats/pool")
+def pool_stats():
+    """
+    Route function for /api/v1/stats/pool
+
+    Displays the statistics of the database connection pool
+    """
+    if storage_t != "db":
+        abort(404)
+    return (jsonify(storage.pool_stats()))
+
+
+@app_views.route("/stats/cache")
+def cache_stats():
+    """
+    Route function for /api/v1/stats/cache
+
+    Displays the statistics of the database query cache
+    """
+    stats = storage.cache_stats() if storage_t == "db" else None
+    if stats is None:
+        abort(404)
+    return (jsonify(stats))
+
+
+@app_views.route("/stats/cache/objects")
+def object_cache_stats():
+    """
+    Route function for /api/v1/stats/cache/objects
+
+    Displays the statistics of the database object cache
+    """
+    stats = storage.object_cache_stats() if storage_t == "db" else None
+    if stats is None:
+        abort(404)
+    return (jsonify(stats))
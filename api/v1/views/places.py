@@ -6,7 +6,6 @@ from flask import abort, jsonify, request
 from api.v1.views import app_views
 from models import storage
 from models import storage_t
-from models.amenity import Amenity
 from models.city import City
 from models.place import Place
 from models.state import State
@@ -20,7 +19,7 @@ def get_places_by_city_id(city_id):
 
     Retrieves all Place objects registered under a City object of given ID
     """
-    city = storage.get(City, city_id)
+    city = storage.get(City, city_id, options={"places": "joined"})
     if city is None:
         abort(404)
     places = [place.to_dict() for place in city.places]
@@ -115,45 +114,30 @@ def get_places_by_search_params():
         dct = request.get_json()
     except Exception:
         return ("Not a JSON", 400)
-    filtered_places = []
     state_ids = dct.get("states")
     city_ids = dct.get("cities")
     amenity_ids = dct.get("amenities")
-
-    all_city_ids = set()
-    if state_ids is not None:
-        for state_id in state_ids:
-            state = storage.get(State, state_id)
-            if state is not None:
+    if storage_t == "db":
+        filtered_places = storage.search_places(state_ids, city_ids,
+                                                amenity_ids)
+    else:
+        filtered_places = []
+        all_city_ids = set()
+        if state_ids is not None:
+            for state in storage.get_many(State, state_ids):
                 for city in state.cities:
                     all_city_ids.add(city.id)
-    if city_ids is not None:
-        for city_id in city_ids:
-            all_city_ids.add(city_id)
-
-    if all_city_ids:
-        for city_id in all_city_ids:
-            city = storage.get(City, city_id)
-            if city is not None:
+        if city_ids is not None:
+            for city_id in city_ids:
+                all_city_ids.add(city_id)
+
+        if all_city_ids:
+            for city in storage.get_many(City, all_city_ids):
                 for place in city.places:
                     filtered_places.append(place)
-    else:
-        filtered_places = list(storage.all(Place).values())
-    if amenity_ids is not None:
-        if storage_t == "db":
-            for amenity_id in amenity_ids:
-                amenity = storage.get(Amenity, amenity_id)
-                if amenity is None:
-                    filtered_places = []
-                    break
-                filtered_places = list(
-                    filter(
-                        lambda place: amenity in place.amenities,
-                        filtered_places
-                    )
-                )
-
         else:
+            filtered_places = list(storage.all(Place).values())
+        if amenity_ids is not None:
             for amenity_id in amenity_ids:
                 filtered_places = list(
                     filter(
@@ -19,18 +19,14 @@ def get_amenities_by_place_id(place_id):
     Retrieves all Amenity objects linked with a Place object
     of given ID
     """
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, options={"amenities": "joined"})
     if place is None:
         abort(404)
     if storage_t == "db":
         return (jsonify([am.to_dict() for am in place.amenities]))
     else:
-        amenities = []
-        for am_id in place.amenity_ids:
-            amenity = storage.get(Amenity, am_id)
-            if amenity is not None:
-                amenities.append(amenity.to_dict())
-        return (jsonify(amenities))
+        amenities = storage.get_many(Amenity, place.amenity_ids)
+        return (jsonify([am.to_dict() for am in amenities]))
 
 
 @app_views.route("/places/<place_id>/amenities/<amenity_id>",
@@ -55,8 +51,9 @@ def delete_amenity_from_place(place_id, amenity_id):
     else:
         if amenity.id not in place.amenity_ids:
             abort(404)
-        idx = place.amenity_ids.index(amenity.id)
-        del place.amenity_ids[idx]
+        amenity_ids = list(place.amenity_ids)
+        amenity_ids.remove(amenity.id)
+        place.amenity_ids = amenity_ids
     storage.save()
     return (jsonify({}), 200)
 
@@ -77,6 +74,6 @@ def link_amenity_to_place(place_id, amenity_id):
     if storage_t == "db":
         place.amenities.append(amenity)
     else:
-        place.amenity_ids.append(amenity.id)
+        place.amenity_ids = place.amenity_ids + [amenity.id]
     storage.save()
     return (jsonify(amenity.to_dict()), 201)
@@ -17,7 +17,7 @@ def get_reviews_by_place_id(place_id):
 
     Retrieves all Review objects registered with the given place_id
     """
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, options={"reviews": "joined"})
     if place is None:
         abort(404)
     reviews = [review.to_dict() for review in place.reviews]
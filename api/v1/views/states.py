@@ -2,7 +2,7 @@
 """
 Handles RESTful API actions for the State class
 """
-from api.v1.views import app_views
+from api.v1.views import app_views, stream_list
 from flask import abort, jsonify, request
 from models import storage
 from models.state import State
@@ -15,8 +15,7 @@ def get_states():
 
     Returns all State objects' representations
     """
-    all_states = storage.all(State)
-    return (jsonify([state.to_dict() for state in all_states.values()]))
+    return (stream_list(storage.iter(State)))
 
 
 @app_views.route("/states/<state_id>", methods=["GET"])
@@ -85,3 +84,50 @@ def update_state(state_id):
             setattr(state, key, dct[key])
     storage.save()
     return (jsonify(state.to_dict()), 200)
+
+
+@app_views.route("/states/batch", methods=["POST"])
+def create_states():
+    """
+    Route function of POST /api/v1/states/batch
+
+    Creates a new State instance from each dictionary of the list in the
+    request body, and saves them all at once
+    """
+    try:
+        dcts = request.get_json()
+    except Exception:
+        return ("Not a JSON", 400)
+    if type(dcts) is not list or any(type(dct) is not dict for dct in dcts):
+        return ("Not a list", 400)
+    if any(dct.get("name") is None for dct in dcts):
+        return ("Missing name", 400)
+    new_states = [State(**dct) for dct in dcts]
+    storage.bulk_new(new_states)
+    return (jsonify([state.to_dict() for state in new_states]), 201)
+
+
+@app_views.route("/states/batch", methods=["PUT"])
+def update_states():
+    """
+    Route function of PUT /api/v1/states/batch
+
+    Updates the State instance of the ID of each dictionary of the list in
+    the request body, if they all exist, and saves them all at once
+    """
+    try:
+        dcts = request.get_json()
+    except Exception:
+        return ("Not a JSON", 400)
+    if type(dcts) is not list or any(type(dct) is not dict for dct in dcts):
+        return ("Not a list", 400)
+    if any(type(dct.get("id")) is not str for dct in dcts):
+        return ("Missing id", 400)
+    ids = [dct["id"] for dct in dcts]
+    if len(storage.get_many(State, set(ids))) != len(set(ids)):
+        abort(404)
+    rows = [{key: dct[key] for key in dct.keys()
+             if key not in ["created_at", "updated_at"]} for dct in dcts]
+    storage.bulk_update(State, rows)
+    states = storage.get_many(State, ids)
+    return (jsonify([state.to_dict() for state in states]), 200)
@@ -3,7 +3,7 @@
 Handles REST operations for the User class
 """
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, stream_list
 from models import storage
 from models.user import User
 
@@ -15,8 +15,7 @@ def get_all_users():
 
     Retrieves all User instances in storage
     """
-    all_users = storage.all(User)
-    return (jsonify([user.to_dict() for user in all_users.values()]))
+    return (stream_list(storage.iter(User)))
 
 
 @app_views.route("/users/<user_id>", methods=["GET"])
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Benchmarks loading seed data: calling save() on each new object against
+storage.bulk_new(), then updating every object with save() against
+storage.bulk_update(), on a file.json (FileStorage) and on a SQLite
+database (SQLiteStorage).
+
+Each engine runs in its own process.
+
+Usage: python3 -m benchmarks.bulk_load [number_of_objects]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+
+def child(total):
+    """times both ways of inserting and updating amenities"""
+    from models import storage
+    from models.amenity import Amenity
+    times = {}
+    start = perf_counter()
+    amenities = [Amenity(name="Amenity {}".format(i)) for i in range(total)]
+    for amenity in amenities:
+        amenity.save()
+    times["save"] = perf_counter() - start
+    start = perf_counter()
+    storage.bulk_new([Amenity(name="Bulk {}".format(i))
+                      for i in range(total)])
+    times["bulk_new"] = perf_counter() - start
+    start = perf_counter()
+    for amenity in amenities:
+        amenity.name = amenity.name + " updated"
+        amenity.save()
+    times["update save"] = perf_counter() - start
+    start = perf_counter()
+    storage.bulk_update(Amenity, [{"id": amenity.id,
+                                   "name": amenity.name + " again"}
+                                  for amenity in amenities])
+    times["bulk_update"] = perf_counter() - start
+    print(json.dumps(times))
+
+
+def main(total):
+    """runs every engine in a new process and compares both ways"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print("{} objects".format(total))
+    print("{:<8} {:>10} {:>10} {:>12} {:>12}".format(
+        "engine", "save (s)", "bulk_new", "update save", "bulk_update"))
+    for engine in ["file", "sqlite"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"),
+                       PYTHONPATH=root)
+            if engine == "sqlite":
+                env["HBNB_TYPE_STORAGE"] = "sqlite"
+            else:
+                env.pop("HBNB_TYPE_STORAGE", None)
+            out = subprocess.run([sys.executable, "-m", __spec__.name,
+                                  "--child", str(total)], cwd=tmp, env=env,
+                                 check=True, capture_output=True, text=True)
+        res = json.loads(out.stdout.splitlines()[-1])
+        print("{:<8} {:>10.2f} {:>10.2f} {:>12.2f} {:>12.2f}".format(
+            engine, res["save"], res["bulk_new"], res["update save"],
+            res["bulk_update"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
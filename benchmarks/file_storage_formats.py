@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Benchmarks the on-disk formats of FileStorage on a synthetic dataset:
+the time to serialize and write every object, the time to read every
+record back, the time to read and build every object, and the size of
+the file.
+
+Usage: python3 -m benchmarks.file_storage_formats [number_of_objects]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import classes
+from models.engine.serializers import serializers
+from models.place import Place
+from models.review import Review
+from models.state import State
+
+
+def dataset(total):
+    """returns the records of total places, reviews and states"""
+    records = {}
+    for i in range(total):
+        if i % 3 == 0:
+            obj = Place(name="Place {}".format(i), number_rooms=i % 7,
+                        latitude=37.77, longitude=-122.41,
+                        description="Cozy room close to downtown")
+        elif i % 3 == 1:
+            obj = Review(text="A very nice place to stay, close to all")
+        else:
+            obj = State(name="State {}".format(i))
+        records[obj.__class__.__name__ + "." + obj.id] = obj.to_dict()
+    return records
+
+
+def main(total):
+    """writes and reads total objects in each format"""
+    records = dataset(total)
+    tmp = tempfile.TemporaryDirectory()
+    print("{} objects".format(total))
+    print("{:<8} {:>10} {:>10} {:>10} {:>10}".format(
+        "format", "save (s)", "load (s)", "build (s)", "size (MB)"))
+    for name, serializer in serializers.items():
+        path = os.path.join(tmp.name, "file" + serializer.extension)
+        start = perf_counter()
+        serializer.write(path, [(key, serializer.dumps(record))
+                                for key, record in records.items()])
+        save = perf_counter() - start
+        start = perf_counter()
+        for _ in serializer.iter_records(path):
+            pass
+        load = perf_counter() - start
+        start = perf_counter()
+        for key, record in serializer.iter_records(path):
+            classes[record["__class__"]](**record)
+        build = perf_counter() - start
+        print("{:<8} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.1f}".format(
+            name, save, load, build, os.path.getsize(path) / 1e6))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
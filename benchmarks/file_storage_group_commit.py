@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Benchmarks concurrent saves, as done by API handlers running on several
+threads, with each save written on its own and with the saves handed to
+the FileStorage flusher, waiting for them to be written or not.
+
+Each mode runs in its own process, as the flusher is set up from the
+environment when FileStorage is instantiated. In no wait mode the saves
+are written when the process exits, which is not timed.
+
+Usage: python3 -m benchmarks.file_storage_group_commit [number_of_objects]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from models.review import Review
+
+modes = {"sync": {}, "group": {"HBNB_FILE_FLUSH_WINDOW": "0.005"},
+         "no wait": {"HBNB_FILE_FLUSH_WINDOW": "0.005"}}
+
+
+def child(mode, path, total, threads, saves):
+    """times saves of threads concurrent writers and prints them as JSON"""
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    objs = [Review(text="A very nice place to stay, close to all")
+            for _ in range(total)]
+    for obj in objs:
+        storage.new(obj)
+    storage.save()
+
+    def write(obj):
+        """updates obj and saves it saves times"""
+        for i in range(saves):
+            obj.text = "edit {}".format(i)
+            storage.save(wait=mode != "no wait")
+
+    workers = [threading.Thread(target=write, args=(objs[i],))
+               for i in range(threads)]
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = perf_counter() - start
+    print(json.dumps({"seconds": seconds}))
+
+
+def main(total, threads=8, saves=20):
+    """runs every mode on total objects"""
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "file.json")
+    print("{} objects, {} threads saving {} times each".format(
+        total, threads, saves))
+    print("{:<10} {:>10} {:>12}".format("mode", "seconds", "saves/s"))
+    for mode, env in modes.items():
+        out = subprocess.run([sys.executable, "-m", __spec__.name,
+                              "--child", mode, path, str(total),
+                              str(threads), str(saves)],
+                             env=dict(os.environ, **env), check=True,
+                             capture_output=True, text=True)
+        res = json.loads(out.stdout.splitlines()[-1])
+        print("{:<10} {:>10.2f} {:>12.0f}".format(
+            mode, res["seconds"], threads * saves / res["seconds"]))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 6 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], *map(int, sys.argv[4:7]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage.all(cls) and FileStorage.count(cls) on a large,
+mixed set of objects, against the previous implementation which scanned
+every stored object on each call.
+
+Usage: python3 -m benchmarks.file_storage_partition [number_of_objects]
+"""
+import sys
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+# share of each class in the generated dataset, out of 1000 objects
+mix = [(Review, 500), (Place, 300), (User, 100), (City, 80),
+       (Amenity, 15), (State, 5)]
+
+
+def scan_all(objects, cls):
+    """previous FileStorage.all(cls): a scan over every stored object"""
+    new_dict = {}
+    for key, value in objects.items():
+        if cls == value.__class__ or cls == value.__class__.__name__:
+            new_dict[key] = value
+    return new_dict
+
+
+def timed(func, *args, repeat=5):
+    """returns the best wall-clock time of repeat calls to func(*args)"""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        func(*args)
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main(total):
+    """fills a FileStorage with total objects and times the lookups"""
+    saved = (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__by_class)
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__by_class = {}
+    storage = FileStorage()
+    try:
+        for cls, share in mix:
+            for _ in range(total * share // 1000):
+                storage.new(cls())
+        objects = storage.all()
+        print("{} objects stored".format(storage.count()))
+        print("{:<8} {:>8} {:>12} {:>12} {:>12} {:>9}".format(
+            "class", "count", "scan (ms)", "all (ms)", "count (ms)",
+            "speedup"))
+        for cls, _ in reversed(mix):
+            scan = timed(scan_all, objects, cls)
+            part = timed(storage.all, cls)
+            cnt = timed(storage.count, cls)
+            print("{:<8} {:>8} {:>12.3f} {:>12.3f} {:>12.4f} {:>8.0f}x".format(
+                cls.__name__, storage.count(cls), scan * 1e3, part * 1e3,
+                cnt * 1e3, scan / part))
+    finally:
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__by_class) = saved
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Benchmarks FileStorage.reload() on a large file.json: duration, parse
+throughput in objects per second and peak resident memory, against the
+previous reload which loaded the whole file with json.load() before
+building any object.
+
+Each reload runs in its own process so peak memory can be compared.
+
+Usage: python3 -m benchmarks.file_storage_reload [number_of_objects]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import FileStorage, classes
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def write_dataset(path, total):
+    """writes a file.json holding total mixed objects to path"""
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    for i in range(total):
+        if i % 10 == 0:
+            storage.new(User(email="user{}@mail.com".format(i)))
+        elif i % 10 < 4:
+            storage.new(Place(name="Place {}".format(i), number_rooms=3))
+        else:
+            storage.new(Review(text="A very nice place to stay, close to "
+                                    "everything. Review number {}".format(i)))
+    storage.save()
+
+
+def child(mode, path):
+    """reloads path in this process and prints the measures as JSON"""
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    start = perf_counter()
+    if mode == "json.load":
+        with open(path, 'r') as f:
+            jo = json.load(f)
+        for key in jo:
+            storage.new(classes[jo[key]["__class__"]](**jo[key]))
+    else:
+        storage.reload()
+    count = storage.count()
+    seconds = perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"objects": count, "seconds": seconds,
+                      "peak_kb": peak}))
+
+
+def main(total):
+    """writes a dataset and compares both ways of reloading it"""
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "file.json")
+    # peak memory is inherited by child processes, so the dataset is not
+    # built in this one
+    subprocess.run([sys.executable, "-m", __spec__.name, "--write",
+                    path, str(total)], check=True)
+    print("{} objects, {:.1f} MB on disk".format(
+        total, os.path.getsize(path) / 1e6))
+    print("{:<10} {:>10} {:>14} {:>14}".format(
+        "reload", "seconds", "objects/s", "peak RSS (MB)"))
+    for mode in ["json.load", "stream"]:
+        out = subprocess.run([sys.executable, "-m", __spec__.name,
+                              "--child", mode, path],
+                             check=True, capture_output=True, text=True)
+        res = json.loads(out.stdout.splitlines()[-1])
+        print("{:<10} {:>10.2f} {:>14.0f} {:>14.1f}".format(
+            mode, res["seconds"], res["objects"] / res["seconds"],
+            res["peak_kb"] / 1024))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 3 and sys.argv[1] == "--write":
+        write_dataset(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""
+Benchmarks the latency of a single-object update followed by
+FileStorage.save(), as done by every PUT route of the API, in snapshot
+and journal mode. The full column serializes every object again, as
+save() did before changed objects were tracked.
+
+Usage: python3 -m benchmarks.file_storage_save [number_of_objects]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from models.review import Review
+
+
+def put_latency(storage, obj, repeat, full=False):
+    """returns the average time of repeat updates of obj and saves"""
+    start = perf_counter()
+    for i in range(repeat):
+        obj.text = "edit {}".format(i)
+        if full:
+            for other in storage.all().values():
+                storage.mark_dirty(other)
+        storage.save()
+    return (perf_counter() - start) / repeat
+
+
+def main(total, repeat=10):
+    """stores total reviews and times single-object saves"""
+    tmp = tempfile.TemporaryDirectory()
+    FileStorage._FileStorage__file_path = os.path.join(tmp.name, "file.json")
+    storage = FileStorage()
+    for obj in list(storage.all().values()):
+        storage.delete(obj)
+    for _ in range(total):
+        storage.new(Review(text="A very nice place to stay, close to all"))
+    storage.save()
+    obj = next(iter(storage.all().values()))
+    print("{} objects stored".format(storage.count()))
+    print("{:<10} {:>12} {:>12}".format("mode", "full (ms)", "dirty (ms)"))
+    for mode in ["snapshot", "journal"]:
+        os.environ["HBNB_FILE_JOURNAL"] = "1" if mode == "journal" else ""
+        storage = FileStorage()
+        full = put_latency(storage, obj, repeat, full=True)
+        dirty = put_latency(storage, obj, repeat)
+        print("{:<10} {:>12.2f} {:>12.2f}".format(
+            mode, full * 1e3, dirty * 1e3))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Stress-tests FileStorage from a growing number of threads, as when the
+API is served with threaded=True: each thread mostly reads states and
+their cities, and sometimes renames a city and saves, in journal mode.
+Prints the throughput and the errors raised for each number of threads.
+
+Usage: python3 -m benchmarks.file_storage_threads [number_of_states]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+from time import perf_counter
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+def run(storage, states, threads, ops):
+    """runs ops operations spread over threads, returns ops/s and errors"""
+    errors = []
+
+    def work(seed):
+        """reads and writes random states"""
+        rand = random.Random(seed)
+        try:
+            for i in range(ops // threads):
+                state = storage.get(State, rand.choice(states))
+                cities = storage.children(City, "state_id", state.id)
+                if i % 10 == 0:
+                    cities[0].name = "City {}".format(i)
+                    storage.save()
+                elif i % 10 == 1:
+                    storage.count(City)
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=work, args=(n,))
+               for n in range(threads)]
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return ops / (perf_counter() - start), errors
+
+
+def main(total, ops=20000):
+    """stores total states with 10 cities each and stresses them"""
+    tmp = tempfile.TemporaryDirectory()
+    FileStorage._FileStorage__file_path = os.path.join(tmp.name, "file.json")
+    os.environ["HBNB_FILE_JOURNAL"] = "1"
+    storage = FileStorage()
+    states = []
+    for i in range(total):
+        state = State(name="State {}".format(i))
+        storage.new(state)
+        states.append(state.id)
+        for j in range(10):
+            storage.new(City(name="City {}".format(j), state_id=state.id))
+    storage.save()
+    print("{} states, {} cities, {} operations".format(
+        total, total * 10, ops))
+    print("{:<8} {:>10} {:>8}".format("threads", "ops/s", "errors"))
+    for threads in [1, 2, 4, 8, 16]:
+        rate, errors = run(storage, states, threads, ops)
+        print("{:<8} {:>10.0f} {:>8}".format(threads, rate, len(errors)))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Benchmarks GET /api/v1/users on a large table: time to first byte, total
+time and peak resident memory of the response streamed from storage.iter()
+against the previous one, built by jsonify() from storage.all().
+
+Each request runs in its own process so peak memory can be compared, on
+a SQLite database (SQLiteStorage) and on a file.json (FileStorage).
+
+Usage: python3 -m benchmarks.list_streaming [number_of_users]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+
+def write_dataset(total):
+    """saves total users to the storage selected by the environment"""
+    from models import storage
+    from models.user import User
+    for i in range(total):
+        storage.new(User(email="user{}@mail.com".format(i), password="pwd",
+                         first_name="First {}".format(i),
+                         last_name="Last {}".format(i)))
+        if i % 10000 == 9999:
+            storage.save()
+    storage.save()
+
+
+def child(mode):
+    """requests the users in this process and prints the measures as JSON"""
+    from api.v1.app import app
+    from flask import jsonify
+    from models import storage
+    from models.user import User
+    from werkzeug.test import EnvironBuilder
+
+    def legacy_users():
+        """the previous GET /api/v1/users"""
+        all_users = storage.all(User)
+        return (jsonify([user.to_dict() for user in all_users.values()]))
+
+    app.add_url_rule("/legacy/users", view_func=legacy_users)
+    url = "/api/v1/users" if mode == "stream" else "/legacy/users"
+    environ = EnvironBuilder(path=url).get_environ()
+    start = perf_counter()
+    first = None
+    size = 0
+    body = app(environ, lambda status, headers: None)
+    for chunk in body:
+        if first is None:
+            first = perf_counter() - start
+        size += len(chunk)
+    body.close()
+    seconds = perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"first_byte": first, "seconds": seconds,
+                      "bytes": size, "peak_kb": peak}))
+
+
+def main(total):
+    """writes the users to each storage and compares both responses"""
+    print("{} users".format(total))
+    print("{:<8} {:<9} {:>14} {:>10} {:>14}".format(
+        "storage", "response", "first byte (s)", "total (s)",
+        "peak RSS (MB)"))
+    for engine in ["sqlite", "file"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"),
+                       PYTHONPATH=os.path.dirname(os.path.dirname(
+                           os.path.abspath(__file__))))
+            if engine == "sqlite":
+                env["HBNB_TYPE_STORAGE"] = "sqlite"
+            else:
+                env.pop("HBNB_TYPE_STORAGE", None)
+            # peak memory is inherited by child processes, so the dataset
+            # is not built in this one
+            subprocess.run([sys.executable, "-m", __spec__.name, "--write",
+                            str(total)], cwd=tmp, env=env, check=True)
+            for mode in ["jsonify", "stream"]:
+                out = subprocess.run([sys.executable, "-m", __spec__.name,
+                                      "--child", mode], cwd=tmp, env=env,
+                                     check=True, capture_output=True,
+                                     text=True)
+                res = json.loads(out.stdout.splitlines()[-1])
+                print("{:<8} {:<9} {:>14.3f} {:>10.2f} {:>14.1f}".format(
+                    engine, mode, res["first_byte"], res["seconds"],
+                    res["peak_kb"] / 1024))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == "--write":
+        write_dataset(int(sys.argv[2]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
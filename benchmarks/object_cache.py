@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Benchmarks GET /api/v1/places/<place_id> on a SQLite database
+(SQLiteStorage), without and with the object cache of
+HBNB_DB_OBJECT_CACHE_SIZE, requesting places picked at random among the
+hot ones, with a PUT of one of them every write_every requests.
+
+SQLite runs in the process, so each query waits latency milliseconds
+first, as it would for the round trip to a MySQL server, see
+benchmarks/query_cache.py.
+
+Usage: python3 -m benchmarks.object_cache [requests] [write_every] [latency]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+
+def write_dataset():
+    """saves 10000 places, of a single user and city"""
+    from models import storage
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    state = State(name="California")
+    city = City(name="Fremont", state_id=state.id)
+    user = User(email="owner@mail.com", password="pwd")
+    storage.bulk_new([state, city, user])
+    storage.bulk_new([Place(name="Place {}".format(i), city_id=city.id,
+                            user_id=user.id, number_rooms=i % 5)
+                      for i in range(10000)])
+
+
+def child(total, write_every, latency):
+    """runs the requests in this process and prints the measures as JSON"""
+    from api.v1.app import app
+    from models import storage
+    from models.place import Place
+    from sqlalchemy import event
+    if latency:
+        event.listen(storage._DBStorage__engine, "before_cursor_execute",
+                     lambda *args: sleep(latency / 1000))
+    rand = random.Random(0)
+    hot = rand.sample([place.id for place in storage.iter(Place)], 500)
+    storage.close()
+    client = app.test_client()
+    start = perf_counter()
+    for i in range(total):
+        place_id = rand.choice(hot)
+        if write_every and i % write_every == write_every - 1:
+            response = client.put("/api/v1/places/" + place_id,
+                                  json={"number_rooms": i % 5})
+        else:
+            response = client.get("/api/v1/places/" + place_id)
+        response.get_data()
+        response.close()
+    seconds = perf_counter() - start
+    print(json.dumps({"seconds": seconds,
+                      "cache": storage.object_cache_stats()}))
+
+
+def main(total, write_every, latency):
+    """writes the dataset and runs the requests without and with cache"""
+    print("{} requests, a write every {}, {} ms per query".format(
+        total, write_every, latency))
+    print("{:<8} {:>10} {:>8} {:>8} {:>8} {:>14}".format(
+        "cache", "total (s)", "req/s", "hits", "misses", "invalidations"))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HBNB_TYPE_STORAGE="sqlite",
+                   HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"),
+                   PYTHONPATH=os.path.dirname(os.path.dirname(
+                       os.path.abspath(__file__))))
+        env.pop("HBNB_ENV", None)
+        env.pop("HBNB_DB_CACHE_SIZE", None)
+        subprocess.run([sys.executable, "-m", __spec__.name, "--write"],
+                       cwd=tmp, env=env, check=True)
+        for size in ["0", "1000"]:
+            out = subprocess.run([sys.executable, "-m", __spec__.name,
+                                  "--child", str(total), str(write_every),
+                                  str(latency)],
+                                 cwd=tmp,
+                                 env=dict(env,
+                                          HBNB_DB_OBJECT_CACHE_SIZE=size),
+                                 check=True, capture_output=True, text=True)
+            res = json.loads(out.stdout.splitlines()[-1])
+            stats = res["cache"] or {"hits": 0, "misses": 0,
+                                     "invalidations": 0}
+            print("{:<8} {:>10.2f} {:>8.0f} {:>8} {:>8} {:>14}".format(
+                "on" if res["cache"] else "off", res["seconds"],
+                total / res["seconds"], stats["hits"], stats["misses"],
+                stats["invalidations"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--write":
+        write_dataset()
+    elif len(sys.argv) > 4 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+             float(sys.argv[3]) if len(sys.argv) > 3 else 0.5)
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""
+Benchmarks POST /api/v1/places_search in database mode: the search run as
+a single SQL query by DBStorage.search_places(), against the previous
+search which loaded states, cities and places through their relationships
+and filtered amenities in Python. Both searches must return the same
+places.
+
+The database is a SQLite file (SQLiteStorage), unless HBNB_TYPE_STORAGE
+is set to db.
+
+Usage: python3 -m benchmarks.places_search [number_of_places]
+"""
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+
+def legacy_search(storage, state_ids, city_ids, amenity_ids):
+    """returns the places found by the previous places_search"""
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    filtered_places = []
+    all_city_ids = set()
+    if state_ids is not None:
+        for state in storage.get_many(State, state_ids):
+            for city in state.cities:
+                all_city_ids.add(city.id)
+    if city_ids is not None:
+        for city_id in city_ids:
+            all_city_ids.add(city_id)
+    if all_city_ids:
+        for city in storage.get_many(City, all_city_ids):
+            for place in city.places:
+                filtered_places.append(place)
+    else:
+        filtered_places = list(storage.all(Place).values())
+    if amenity_ids is not None:
+        amenities = storage.get_many(Amenity, amenity_ids)
+        if len(set(amenities)) != len(set(amenity_ids)):
+            filtered_places = []
+        for amenity in amenities:
+            filtered_places = list(
+                filter(lambda place: amenity in place.amenities,
+                       filtered_places))
+    return filtered_places
+
+
+def write_dataset(storage, total):
+    """
+    saves 50 states of 20 cities, 30 amenities, 100 users and total
+    places, each with 3 random amenities, and returns the IDs of the
+    states, cities and amenities
+    """
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    rand = random.Random(0)
+    states = [State(name="State {}".format(i)) for i in range(50)]
+    cities = [City(name="City {}".format(i), state_id=states[i % 50].id)
+              for i in range(1000)]
+    amenities = [Amenity(name="Amenity {}".format(i)) for i in range(30)]
+    users = [User(email="user{}@mail.com".format(i), password="pwd")
+             for i in range(100)]
+    for obj in states + cities + amenities + users:
+        storage.new(obj)
+    storage.save()
+    for i in range(total):
+        place = Place(name="Place {}".format(i),
+                      city_id=rand.choice(cities).id,
+                      user_id=rand.choice(users).id)
+        place.amenities.extend(rand.sample(amenities, 3))
+        storage.new(place)
+        if i % 5000 == 4999:
+            storage.save()
+    storage.save()
+    return ([obj.id for obj in states], [obj.id for obj in cities],
+            [obj.id for obj in amenities])
+
+
+def main(total):
+    """builds a database of total places and times both searches"""
+    tmp = tempfile.TemporaryDirectory()
+    if os.environ.get("HBNB_TYPE_STORAGE") != "db":
+        os.environ["HBNB_TYPE_STORAGE"] = "sqlite"
+        os.environ["HBNB_SQLITE_DB"] = os.path.join(tmp.name, "hbnb.db")
+    from models import storage
+    start = perf_counter()
+    state_ids, city_ids, amenity_ids = write_dataset(storage, total)
+    print("{} places written in {:.1f}s".format(
+        total, perf_counter() - start))
+    searches = {
+        "states": {"states": state_ids[:5]},
+        "cities": {"cities": city_ids[:50]},
+        "states+cities": {"states": state_ids[:2], "cities": city_ids[-20:]},
+        "amenity": {"states": state_ids[:5], "amenities": amenity_ids[:1]},
+        "2 amenities": {"amenities": amenity_ids[:2]},
+        "everything": {},
+    }
+    print("{:<14} {:>8} {:>12} {:>12} {:>8}".format(
+        "search", "places", "python (s)", "sql (s)", "speedup"))
+    for name, search in searches.items():
+        args = (search.get("states"), search.get("cities"),
+                search.get("amenities"))
+        times = []
+        found = []
+        for run in [lambda: legacy_search(storage, *args),
+                    lambda: storage.search_places(*args)]:
+            storage.close()
+            start = perf_counter()
+            found.append(sorted(place.id for place in run()))
+            times.append(perf_counter() - start)
+        if found[0] != found[1]:
+            raise AssertionError("different places found by " + name)
+        print("{:<14} {:>8} {:>12.3f} {:>12.3f} {:>7.1f}x".format(
+            name, len(found[1]), times[0], times[1], times[0] / times[1]))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
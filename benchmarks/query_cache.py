@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Benchmarks the repeated reads of the API on a SQLite database
+(SQLiteStorage), without and with the query cache of HBNB_DB_CACHE_SIZE:
+GET /api/v1/states, /api/v1/amenities, /api/v1/states/<id>/cities and
+/api/v1/stats, each requested in turn, with a PUT every write_every
+requests invalidating the results read from the states table. The first
+two stream their rows through storage.iter(), which does not use the
+cache, and are there to measure the cost of the cache to other reads.
+
+SQLite runs in the process, so each query waits latency milliseconds
+first, as it would for the round trip to a MySQL server (0.5 ms, about
+that of a local network). Rebuilding an object from the cache costs about
+as much as loading it from a SQLite row, so without that latency only the
+queries reading many rows for a few results, such as counts, get faster.
+
+Usage: python3 -m benchmarks.query_cache [requests] [write_every] [latency]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+
+def write_dataset():
+    """saves 50 states of 20 cities each and 30 amenities"""
+    from models import storage
+    from models.amenity import Amenity
+    from models.city import City
+    from models.state import State
+    for i in range(50):
+        state = State(name="State {}".format(i))
+        storage.new(state)
+        for j in range(20):
+            storage.new(City(name="City {}".format(j), state_id=state.id))
+    for i in range(30):
+        storage.new(Amenity(name="Amenity {}".format(i)))
+    storage.save()
+
+
+def child(total, write_every, latency):
+    """runs the requests in this process and prints the measures as JSON"""
+    from api.v1.app import app
+    from models import storage
+    from models.state import State
+    from sqlalchemy import event
+    if latency:
+        event.listen(storage._DBStorage__engine, "before_cursor_execute",
+                     lambda *args: sleep(latency / 1000))
+    state_ids = [state.id for state in storage.all(State).values()]
+    storage.close()
+    client = app.test_client()
+    start = perf_counter()
+    for i in range(total):
+        state_id = state_ids[i % len(state_ids)]
+        if write_every and i % write_every == write_every - 1:
+            response = client.put("/api/v1/states/" + state_id,
+                                  json={"name": "State {}".format(i)})
+        else:
+            url = ["/api/v1/states", "/api/v1/amenities",
+                   "/api/v1/states/{}/cities".format(state_id),
+                   "/api/v1/stats"][i % 4]
+            response = client.get(url)
+        response.get_data()
+        response.close()
+    seconds = perf_counter() - start
+    print(json.dumps({"seconds": seconds, "cache": storage.cache_stats()}))
+
+
+def main(total, write_every, latency):
+    """writes the dataset and runs the requests without and with cache"""
+    print("{} requests, a write every {}, {} ms per query".format(
+        total, write_every, latency))
+    print("{:<8} {:>10} {:>8} {:>8} {:>8} {:>14}".format(
+        "cache", "total (s)", "req/s", "hits", "misses", "invalidations"))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HBNB_TYPE_STORAGE="sqlite",
+                   HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"),
+                   PYTHONPATH=os.path.dirname(os.path.dirname(
+                       os.path.abspath(__file__))))
+        env.pop("HBNB_ENV", None)
+        subprocess.run([sys.executable, "-m", __spec__.name, "--write"],
+                       cwd=tmp, env=env, check=True)
+        for size in ["0", "256"]:
+            out = subprocess.run([sys.executable, "-m", __spec__.name,
+                                  "--child", str(total), str(write_every),
+                                  str(latency)],
+                                 cwd=tmp, env=dict(env,
+                                                   HBNB_DB_CACHE_SIZE=size),
+                                 check=True, capture_output=True, text=True)
+            res = json.loads(out.stdout.splitlines()[-1])
+            stats = res["cache"] or {"hits": 0, "misses": 0,
+                                     "invalidations": 0}
+            print("{:<8} {:>10.2f} {:>8.0f} {:>8} {:>8} {:>14}".format(
+                "on" if res["cache"] else "off", res["seconds"],
+                total / res["seconds"], stats["hits"], stats["misses"],
+                stats["invalidations"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--write":
+        write_dataset()
+    elif len(sys.argv) > 4 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+             float(sys.argv[3]) if len(sys.argv) > 3 else 0.5)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Benchmarks the storage engines against each other: FileStorage,
+SQLiteStorage and DBStorage (MySQL). Each engine runs in its own process
+on an empty store and measures inserting objects, saved by batches of
+100, then a second process measures opening the store, including the
+imports, and reading: get() by id, count() and all() of a class.
+
+DBStorage uses the HBNB_MYSQL_* variables and is reported as unavailable
+when no MySQL server or driver can be reached.
+
+Usage: python3 -m benchmarks.storage_engines [number_of_objects]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+engines = {"file": "file", "sqlite": "sqlite", "mysql": "db"}
+
+
+def child(mode, total):
+    """
+    runs the measures of mode on models.storage and prints them as JSON:
+    write inserts total states, read opens the store they were saved to
+    """
+    start = perf_counter()
+    from models import storage
+    from models.state import State
+    times = {}
+    if mode == "write":
+        for i in range(total):
+            storage.new(State(name="State {}".format(i)))
+            if i % 100 == 99:
+                storage.save()
+        storage.save()
+        times["insert"] = perf_counter() - start
+        print(json.dumps(times))
+        return
+    storage.count(State)
+    times["open"] = perf_counter() - start
+    ids = [obj.id for obj in storage.all(State).values()]
+    storage.close()
+    sample = random.sample(ids, min(1000, len(ids)))
+    start = perf_counter()
+    for id in sample:
+        storage.get(State, id)
+    times["get"] = (perf_counter() - start) / len(sample)
+    start = perf_counter()
+    times["objects"] = storage.count(State)
+    times["count"] = perf_counter() - start
+    start = perf_counter()
+    storage.all(State)
+    times["all"] = perf_counter() - start
+    print(json.dumps(times))
+
+
+def main(total):
+    """runs every engine in a new process and compares them"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print("{} objects".format(total))
+    print("{:<8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "engine", "insert/s", "open s", "get us", "count ms", "all ms"))
+    for name, storage_type in engines.items():
+        res = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_TYPE_STORAGE=storage_type,
+                       HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"),
+                       PYTHONPATH=root)
+            for mode in ["write", "read"]:
+                out = subprocess.run([sys.executable, "-m", __spec__.name,
+                                      "--child", mode, str(total)], cwd=tmp,
+                                     env=env, capture_output=True, text=True)
+                if out.returncode:
+                    break
+                res.update(json.loads(out.stdout.splitlines()[-1]))
+        if out.returncode:
+            print("{:<8} unavailable".format(name))
+            continue
+        print("{:<8} {:>10.0f} {:>10.3f} {:>10.1f} {:>10.2f} {:>10.1f}"
+              .format(name, res["objects"] / res["insert"], res["open"],
+                      res["get"] * 1e6, res["count"] * 1e3,
+                      res["all"] * 1e3))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
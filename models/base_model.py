@@ -47,6 +47,12 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and marks the instance as changed"""
+            super().__setattr__(name, value)
+            models.storage.mark_dirty(self)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         class_name = self.__class__.__name__
@@ -71,6 +77,9 @@ class BaseModel:
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
+            # related objects loaded along with this one
+            for name in self.__mapper__.relationships.keys():
+                new_dict.pop(name, None)
         if models.storage_t == 'db' and 'password' in new_dict:
             del new_dict['password']
         return new_dict
@@ -4,7 +4,7 @@ import models
 from models.base_model import BaseModel, Base
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 
@@ -12,10 +12,16 @@ class City(BaseModel, Base):
     """Representation of city """
     if models.storage_t == "db":
         __tablename__ = 'cities'
-        state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
+        # the cities of a state, by name
+        __table_args__ = (Index('ix_cities_state_id_name', 'state_id',
+                                'name'),)
+        state_id = Column(String(60),
+                          ForeignKey('states.id', ondelete='CASCADE'),
+                          nullable=False)
         name = Column(String(128), nullable=False)
-        places = relationship("Place", backref="cities", 
-                                cascade="all, delete, delete-orphan")
+        places = relationship("Place", backref="cities",
+                              cascade="all, delete, delete-orphan",
+                              passive_deletes=True)
     else:
         state_id = ""
         name = ""
@@ -23,3 +29,10 @@ class City(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes city"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != "db":
+        @property
+        def places(self):
+            """getter for list of place instances located in the city"""
+            from models.place import Place
+            return models.storage.children(Place, "city_id", self.id)
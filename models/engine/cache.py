@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+"""
+Contains the QueryCache class
+"""
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+
+
+class QueryCache:
+    """
+    cache of query results, each one recorded with the names of the
+    tables it was read from, or with other tags, such as the rows of a
+    table it was read from
+
+    The cache holds up to size results, evicting the least recently used
+    one to make room for a new one, and drops results older than ttl
+    seconds. invalidate() drops the results read from the tables given,
+    and keeps put() from recording the results read from them before.
+    Only the last invalidation of size tables is remembered, results read
+    before an older one are not recorded at all
+    """
+
+    def __init__(self, size=256, ttl=60.0):
+        """Instantiate an empty QueryCache"""
+        self.size = size
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        # result key: (expiry time, tables, result), least recent first
+        self.__entries = OrderedDict()
+        # table name: keys of the results read from the table
+        self.__tables = {}
+        # table name: version of the last invalidation of the table, least
+        # recent first
+        self.__changed = OrderedDict()
+        # version of the last invalidation dropped from __changed
+        self.__forgotten = 0
+        self.__version = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+        self.__invalidations = 0
+
+    def get(self, key):
+        """
+        returns a tuple of whether the cache holds a result for key and
+        of that result
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] <= monotonic():
+                self.__remove(key)
+                self.__expirations += 1
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                return (False, None)
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return (True, entry[2])
+
+    def version(self):
+        """returns the current version of the cache, see put()"""
+        with self.__lock:
+            return self.__version
+
+    def put(self, key, tables, result, version=None):
+        """
+        records the result of key, read from the tables named in tables
+
+        Given the version of the cache when the result started being
+        read, the result is not recorded if one of the tables has been
+        invalidated since, as it may hold the previous rows, or if an
+        invalidation since is no longer remembered
+        """
+        with self.__lock:
+            if version is not None and (
+                    version < self.__forgotten or
+                    any(self.__changed.get(table, 0) > version
+                        for table in tables)):
+                return
+            if key in self.__entries:
+                self.__remove(key)
+            while self.__entries and len(self.__entries) >= self.size:
+                self.__remove(next(iter(self.__entries)))
+                self.__evictions += 1
+            if self.size <= 0:
+                return
+            tables = frozenset(tables)
+            self.__entries[key] = (monotonic() + self.ttl, tables, result)
+            for table in tables:
+                self.__tables.setdefault(table, set()).add(key)
+
+    def invalidate(self, tables):
+        """drops the results read from any of the tables named in tables"""
+        with self.__lock:
+            self.__version += 1
+            for table in tables:
+                self.__changed[table] = self.__version
+                self.__changed.move_to_end(table)
+                for key in list(self.__tables.get(table, ())):
+                    self.__remove(key)
+                    self.__invalidations += 1
+            while len(self.__changed) > max(self.size, 0):
+                table, self.__forgotten = self.__changed.popitem(last=False)
+
+    def clear(self):
+        """drops every result"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__tables.clear()
+
+    def __remove(self, key):
+        """drops the result of key, the lock being held"""
+        expiry, tables, result = self.__entries.pop(key)
+        for table in tables:
+            keys = self.__tables[table]
+            keys.discard(key)
+            if not keys:
+                del self.__tables[table]
+
+    def stats(self):
+        """
+        returns a dictionary of the cache statistics: the number of
+        results held and the most it holds, the number of lookups finding
+        a result (hits) or not (misses), and the number of results
+        dropped to make room (evictions), for being too old (expirations)
+        or for being read from a changed table (invalidations)
+        """
+        with self.__lock:
+            return {"entries": len(self.__entries), "size": self.size,
+                    "ttl": self.ttl, "hits": self.__hits,
+                    "misses": self.__misses, "evictions": self.__evictions,
+                    "expirations": self.__expirations,
+                    "invalidations": self.__invalidations}
@@ -3,21 +3,32 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
+from itertools import chain
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.cache import QueryCache
+from models.engine.pool import pools
+from models.engine.routing import RoutingSession
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import create_engine, distinct, event, func, inspect
+from sqlalchemy import literal, or_, select, union_all, update
+from sqlalchemy.orm import defaultload, joinedload, make_transient_to_detached
+from sqlalchemy.orm import scoped_session, selectinload, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.schema import AddConstraint
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# loader options of each strategy of loading related objects
+strategies = {"selectin": selectinload, "joined": joinedload}
 
 
 class DBStorage:
@@ -26,61 +37,631 @@ class DBStorage:
     __session = None
 
     def __init__(self):
-        """Instantiate a DBStorage object"""
+        """
+        Instantiate a DBStorage object
+
+        Setting HBNB_DB_REPLICAS to a comma-separated list of database
+        URLs reads from those replicas of the database, while writes go
+        to the primary one. Once a session writes, it reads from the
+        primary as well until it is closed, at the end of each request
+
+        Setting HBNB_DB_CACHE_SIZE to a number of results caches that many
+        results of the queries of all(), get() loading related objects,
+        get_many(), children(), search_places(), count() and count_all(),
+        for up to HBNB_DB_CACHE_TTL seconds (60). A result is dropped once
+        a session commits changes to a table it was read from. Changes
+        committed by other processes are only seen once their results
+        expire
+
+        Setting HBNB_DB_OBJECT_CACHE_SIZE to a number of objects keeps
+        snapshots of the rows of that many objects read by get(), shared
+        by the sessions of every request, for up to HBNB_DB_CACHE_TTL
+        seconds as well. A snapshot is dropped once a session commits an
+        update or a deletion of its row
+        """
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__engine = self.make_engine(self.url())
+        self.__replicas = [self.make_engine(url.strip()) for url in
+                           getenv('HBNB_DB_REPLICAS', '').split(',')
+                           if url.strip()]
+        self.__cache = None
+        if int(getenv('HBNB_DB_CACHE_SIZE', 0)) > 0:
+            self.__cache = QueryCache(
+                int(getenv('HBNB_DB_CACHE_SIZE')),
+                float(getenv('HBNB_DB_CACHE_TTL', 60)))
+        self.__objects = None
+        if int(getenv('HBNB_DB_OBJECT_CACHE_SIZE', 0)) > 0:
+            self.__objects = QueryCache(
+                int(getenv('HBNB_DB_OBJECT_CACHE_SIZE')),
+                float(getenv('HBNB_DB_CACHE_TTL', 60)))
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+
+    def url(self):
+        """returns the URL of the MySQL database"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
+        return ('mysql+mysqldb://{}:{}@{}/{}'.
+                format(HBNB_MYSQL_USER,
+                       HBNB_MYSQL_PWD,
+                       HBNB_MYSQL_HOST,
+                       HBNB_MYSQL_DB))
+
+    def make_engine(self, url):
+        """returns the engine connecting to the database at url"""
+        return create_engine(url, **self.pool_options())
+
+    def pool_options(self):
+        """
+        returns the connection pool arguments of create_engine(), read
+        from the environment
+
+        HBNB_DB_POOL chooses between a pool keeping connections open
+        (queue, the default) and opening one for each use (null). A queue
+        pool keeps HBNB_DB_POOL_SIZE connections (5), opens up to
+        HBNB_DB_POOL_MAX_OVERFLOW more under load (10), waits up to
+        HBNB_DB_POOL_TIMEOUT seconds for one to be free (30) and replaces
+        connections older than HBNB_DB_POOL_RECYCLE seconds (never).
+        Setting HBNB_DB_POOL_PRE_PING to 1 tests each connection before
+        using it, replacing the stale ones
+        """
+        name = getenv('HBNB_DB_POOL', 'queue')
+        if name not in pools:
+            raise ValueError("unknown HBNB_DB_POOL: {}".format(name))
+        options = {"poolclass": pools[name],
+                   "pool_pre_ping": getenv('HBNB_DB_POOL_PRE_PING') == "1",
+                   "pool_recycle": int(getenv('HBNB_DB_POOL_RECYCLE', -1))}
+        if name == "queue":
+            options.update({
+                "pool_size": int(getenv('HBNB_DB_POOL_SIZE', 5)),
+                "max_overflow": int(getenv('HBNB_DB_POOL_MAX_OVERFLOW', 10)),
+                "pool_timeout": float(getenv('HBNB_DB_POOL_TIMEOUT', 30))})
+        return options
+
+    def pool_stats(self):
+        """returns the statistics of the connection pool, by name"""
+        return self.__engine.pool.stats()
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def cache_stats(self):
+        """
+        returns the statistics of the query cache, see QueryCache.stats(),
+        or None when there is no cache
+        """
+        if self.__cache is None:
+            return None
+        return self.__cache.stats()
+
+    def object_cache_stats(self):
+        """
+        returns the statistics of the object cache, see QueryCache.stats(),
+        or None when there is no cache
+        """
+        if self.__objects is None:
+            return None
+        return self.__objects.stats()
+
+    def all(self, cls=None, options=None):
+        """
+        query on the current database session
+
+        Given a class, options maps the relationships of the class to
+        load along with its objects to a strategy: selectin, loading the
+        related objects of every object with one more query, or joined,
+        loading them in the same query. A relationship of related objects
+        is named by its path, as in {"cities": "selectin",
+        "cities.places": "selectin"}
+        """
         new_dict = {}
+        if cls is None:
+            options = None
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                query = self.__session.query(classes[clss])
+                if options:
+                    query = query.options(
+                        *self.__loaders(classes[clss], options))
+                objs = self.__cached(
+                    ("all", clss, tuple(sorted((options or {}).items()))),
+                    self.__tables(classes[clss], options), query.all)
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter(self, cls=None, batch_size=1000):
+        """
+        Generates the objects of a given class in storage, or of every
+        class, reading the rows batch_size at a time, with a server-side
+        cursor where the database driver has one, instead of loading
+        them all at once
+
+        The query cache is not used, as it would hold every row at once
+        """
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                yield from self.__session.scalars(
+                    select(classes[clss])
+                    .execution_options(yield_per=batch_size))
+
     def new(self, obj):
         """add the object to the current database session"""
+        self.__session().stick()
         self.__session.add(obj)
 
-    def get(self, cls, id):
-        """Retrieves a specific object of a given class and ID"""
-        all_objs = self.all(cls)
-        key = cls.__name__ + "." + id
-        return (all_objs.get(key))
+    def bulk_new(self, objs):
+        """
+        add the objects of objs to the current database session and
+        commit them, the rows of each table being inserted by batches
+        """
+        self.__session().stick()
+        self.__session.add_all(objs)
+        self.__session.commit()
+
+    def bulk_update(self, cls, rows):
+        """
+        update the objects of a given class from rows, dictionaries of
+        the ID of an object and of the values to set, with one UPDATE
+        statement run for every row, and commit them
+
+        updated_at is set to the current time, as save() does. Values of
+        attributes that are not columns are left out, as are rows of IDs
+        that are not in the database, and a class that is not stored
+        updates nothing. The values are set on an object of the class
+        first, as they would be on a loaded object, so that a User hashes
+        its password
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return
+        self.__session().stick()
+        columns = set(cls.__table__.columns.keys()) - {
+            "id", "created_at", "updated_at"}
+        known = set(self.__session.scalars(select(cls.id).where(
+            cls.id.in_({row["id"] for row in rows}))))
+        now = datetime.utcnow()
+        scratch = cls()
+        values = []
+        for row in rows:
+            if row["id"] not in known:
+                continue
+            for key, value in row.items():
+                if key in columns:
+                    setattr(scratch, key, value)
+            values.append(dict({key: getattr(scratch, key)
+                                for key in row if key in columns},
+                               id=row["id"], updated_at=now))
+        if values:
+            self.__session.execute(update(cls), values)
+        # objects already loaded still hold the previous values
+        for row in values:
+            obj = self.__session.identity_map.get(
+                self.__session.identity_key(cls, row["id"]))
+            if obj is not None:
+                for key, value in row.items():
+                    set_committed_value(obj, key, value)
+        self.__session.commit()
+
+    def get(self, cls, id, options=None):
+        """
+        Retrieves a specific object of a given class and ID
+
+        Objects already in the session's identity map are returned
+        without querying the database, as are those the object cache
+        holds a snapshot of. options names the relationships to load
+        along with the object, see all()
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values() or id is None:
+            return None
+        if options:
+            objs = self.__cached(
+                ("get", cls.__name__, id, tuple(sorted(options.items()))),
+                self.__tables(cls, options),
+                lambda: [obj for obj in [self.__session.get(
+                    cls, id, options=self.__loaders(cls, options))]
+                    if obj is not None])
+            return objs[0] if objs else None
+        session = self.__session()
+        if (self.__objects is None or not self.__clean(session) or
+                session.identity_map.get(session.identity_key(cls, id))):
+            return session.get(cls, id)
+        table = cls.__table__.name
+        found, snapshot = self.__objects.get((table, id))
+        if found:
+            return self.__restore(session, snapshot)
+        version = self.__objects.version()
+        obj = session.get(cls, id)
+        if obj is not None:
+            # dropped along with the row, or with any row of the table when
+            # a statement changes rows the session does not know of
+            self.__objects.put((table, id), {(table, id), (table, None)},
+                               self.__snapshot(obj, ()), version)
+        return obj
+
+    def __loaders(self, cls, options):
+        """
+        returns the loader options of a query of cls loading the
+        relationships named in options, see all()
+        """
+        loaders = []
+        for path, strategy in options.items():
+            if strategy not in strategies:
+                raise ValueError("unknown loading strategy: {}"
+                                 .format(strategy))
+            names = path.split(".")
+            loader = None
+            owner = cls
+            for i, name in enumerate(names):
+                attr = getattr(owner, name)
+                # the relationships leading to the last one are loaded as
+                # they would be anyway
+                load = (strategies[strategy] if i == len(names) - 1
+                        else defaultload)
+                if loader is not None:
+                    load = getattr(loader, load.__name__)
+                loader = load(attr)
+                owner = attr.property.mapper.class_
+            loaders.append(loader)
+        return loaders
+
+    def get_many(self, cls, ids):
+        """
+        Retrieves the objects of a given class for each ID in ids, in
+        order, skipping the IDs that are not in the database
+
+        All the objects are fetched with a single query
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        ids = [id for id in ids if id is not None]
+        if cls not in classes.values() or not ids:
+            return []
+        objs = self.__cached(
+            ("get_many", cls.__name__, tuple(ids)), self.__tables(cls),
+            self.__session.query(cls).filter(cls.id.in_(set(ids))).all)
+        found = {obj.id: obj for obj in objs}
+        return [found[id] for id in ids if id in found]
+
+    def children(self, cls, fk, id):
+        """
+        Retrieves the objects of a given class whose foreign key fk holds
+        the given parent ID
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values() or not hasattr(cls, fk):
+            return []
+        return self.__cached(
+            ("children", cls.__name__, fk, id), self.__tables(cls),
+            self.__session.query(cls).filter(getattr(cls, fk) == id).all)
+
+    def search_places(self, state_ids=None, city_ids=None, amenity_ids=None):
+        """
+        Retrieves the places of the cities with an ID in city_ids or of a
+        state with an ID in state_ids, or every place when there is no
+        such city, having every amenity with an ID in amenity_ids, with a
+        single query, see POST /api/v1/places_search
+        """
+        query = self.__session.query(Place)
+        if state_ids or city_ids:
+            cities = select(City.id).where(or_(
+                City.state_id.in_(state_ids or []),
+                City.id.in_(city_ids or [])))
+            match = Place.city_id.in_(cities)
+            if not city_ids:
+                match = or_(match, ~cities.exists())
+            query = query.filter(match)
+        if amenity_ids:
+            ids = set(amenity_ids)
+            links = Base.metadata.tables['place_amenity'].c
+            query = query.filter(Place.id.in_(
+                select(links.place_id)
+                .where(links.amenity_id.in_(ids))
+                .group_by(links.place_id)
+                .having(func.count(distinct(links.amenity_id)) == len(ids))))
+        key = ("search_places", tuple(state_ids or ()),
+               tuple(city_ids or ()), tuple(amenity_ids or ()))
+        return self.__cached(key, {"places", "cities", "place_amenity"},
+                             query.all)
 
     def count(self, cls=None):
-        """Returns the number of objects of a given class in storage"""
-        return (len(self.all(cls)))
+        """
+        Returns the number of objects of a given class in storage
+
+        The rows are counted by the database, without loading them
+        """
+        if cls is None:
+            return sum(self.count_all().values())
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return 0
+        return self.__cached(
+            ("count", cls.__name__), self.__tables(cls),
+            self.__session.query(func.count()).select_from(cls).scalar)
+
+    def count_all(self):
+        """
+        Returns the number of objects of each class in storage, by class
+        name, counted with a single query
+        """
+        query = union_all(*[select(literal(name), func.count())
+                            .select_from(classes[name])
+                            for name in classes])
+        tables = {classes[name].__table__.name for name in classes}
+        return dict(self.__cached(
+            ("count_all",), tables,
+            lambda: dict(self.__session.execute(query).all())))
+
+    def __tables(self, cls, options=None):
+        """
+        returns the names of the tables read by a query of cls loading the
+        relationships named in options, see all()
+        """
+        tables = {cls.__table__.name}
+        for path in options or {}:
+            owner = cls
+            for name in path.split("."):
+                relationship = getattr(owner, name).property
+                owner = relationship.mapper.class_
+                tables.add(owner.__table__.name)
+                if relationship.secondary is not None:
+                    tables.add(relationship.secondary.name)
+        return tables
+
+    def __cached(self, key, tables, load):
+        """
+        returns the result of load(), objects or counts read from the
+        tables named in tables, from the query cache if it holds the
+        result of key, recording it there otherwise
+
+        The cache is not used while the session holds changes that are
+        not committed yet, which load() would see, see __clean()
+        """
+        session = self.__session()
+        if self.__cache is None or not self.__clean(session):
+            return load()
+        found, result = self.__cache.get(key)
+        if found:
+            if isinstance(result, tuple):
+                # objects rebuilt from their snapshots without querying
+                # the database
+                return [self.__restore(session, snapshot)
+                        for snapshot in result]
+            return result
+        version = self.__cache.version()
+        result = load()
+        value = result
+        if isinstance(result, list):
+            value = tuple(self.__snapshot(obj, tables) for obj in result)
+        self.__cache.put(key, tables, value, version)
+        return result
+
+    def __clean(self, session):
+        """
+        returns whether session holds no change that is not committed yet,
+        so it reads the same rows as the caches
+        """
+        return not (session.info.get("changed") or session.new or
+                    session.dirty or session.deleted)
+
+    def __snapshot(self, obj, tables, path=()):
+        """
+        returns a snapshot of obj, a tuple of its class, of the values of
+        its columns and of the snapshots of the collections of related
+        objects loaded along with it from the tables named in tables
+
+        Collections leading back to an object of path, the objects the
+        snapshot of obj is part of, are left out
+        """
+        mapper = inspect(obj).mapper
+        path = path + (obj,)
+        values = tuple((attr.key, obj.__dict__[attr.key])
+                       for attr in mapper.column_attrs
+                       if attr.key in obj.__dict__)
+        collections = []
+        for relationship in mapper.relationships:
+            if (not relationship.uselist or
+                    relationship.key not in obj.__dict__ or
+                    relationship.target.name not in tables or
+                    (relationship.secondary is not None and
+                     relationship.secondary.name not in tables)):
+                continue
+            related = obj.__dict__[relationship.key]
+            if any(other in path for other in related):
+                continue
+            collections.append((relationship.key, tuple(
+                self.__snapshot(other, tables, path) for other in related)))
+        return (mapper.class_, values, tuple(collections))
 
-    def save(self):
-        """commit all changes of the current database session"""
+    def __restore(self, session, snapshot):
+        """
+        returns the object of a snapshot, see __snapshot(), attached to
+        session as if loaded from the database, unless session already
+        holds the object
+        """
+        cls, values, collections = snapshot
+        values = dict(values)
+        obj = session.identity_map.get(session.identity_key(cls, values["id"]))
+        if obj is not None:
+            return obj
+        obj = inspect(cls).class_manager.new_instance()
+        obj.__dict__.update(values)
+        make_transient_to_detached(obj)
+        for key, related in collections:
+            set_committed_value(obj, key, [self.__restore(session, other)
+                                           for other in related])
+        session.add(obj)
+        return obj
+
+    def __flushed(self, session, flush_context):
+        """
+        records the tables a session writes to in a flush, and the rows
+        written, by (table name, ID)
+        """
+        changed = session.info.setdefault("changed", set())
+        for obj in chain(session.new, session.dirty, session.deleted):
+            mapper = inspect(obj).mapper
+            changed.update(table.name for table in mapper.tables)
+            changed.update((table.name, obj.id) for table in mapper.tables)
+            changed.update(relationship.secondary.name
+                           for relationship in mapper.relationships
+                           if relationship.secondary is not None)
+        # rows the database deletes along, unknown to the session
+        for obj in session.deleted:
+            for table in self.__cascaded(inspect(obj).mapper):
+                changed.update([table, (table, None)])
+
+    def __cascaded(self, mapper):
+        """
+        returns the names of the tables the database deletes rows of along
+        with a row of mapper, through the foreign keys deleting on cascade
+        of the relationships with passive deletes
+        """
+        tables = set()
+        mappers = [mapper]
+        while mappers:
+            for relationship in mappers.pop().relationships:
+                if relationship.secondary is not None:
+                    tables.add(relationship.secondary.name)
+                elif (relationship.passive_deletes and
+                      relationship.target.name not in tables):
+                    tables.add(relationship.target.name)
+                    mappers.append(relationship.mapper)
+        return tables
+
+    def __executed(self, orm_execute_state):
+        """
+        records the table a session writes to with a DML statement, and
+        the rows written, by (table name, ID), or (table name, None) when
+        they are not known
+        """
+        state = orm_execute_state
+        if state.is_insert or state.is_update or state.is_delete:
+            if state.bind_mapper is not None:
+                changed = state.session.info.setdefault("changed", set())
+                rows = state.parameters
+                for table in state.bind_mapper.tables:
+                    changed.add(table.name)
+                    if (isinstance(rows, list) and
+                            all("id" in row for row in rows)):
+                        changed.update((table.name, row["id"])
+                                       for row in rows)
+                    else:
+                        changed.add((table.name, None))
+
+    def __committed(self, session):
+        """
+        drops the cached results read from the tables a session wrote,
+        and the snapshots of the rows it wrote
+        """
+        changed = session.info.pop("changed", ())
+        for cache in [self.__cache, self.__objects]:
+            if cache is not None:
+                cache.invalidate(changed)
+
+    def __rolled_back(self, session):
+        """forgets the tables a session wrote, its changes being undone"""
+        session.info.pop("changed", None)
+
+    def save(self, wait=True):
+        """
+        commit all changes of the current database session
+
+        The commit always completes before returning, wait is accepted
+        for compatibility with FileStorage.save()
+        """
         self.__session.commit()
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
+            self.__session().stick()
             self.__session.delete(obj)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession,
+                                    replicas=self.__replicas)
+        if self.__cache is not None or self.__objects is not None:
+            event.listen(sess_factory, "after_flush", self.__flushed)
+            event.listen(sess_factory, "do_orm_execute", self.__executed)
+            event.listen(sess_factory, "after_commit", self.__committed)
+            event.listen(sess_factory, "after_rollback", self.__rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
+    def add_indexes(self):
+        """
+        creates the indexes declared on the models that the tables of the
+        database lack, and returns their names
+
+        reload() creates the indexes of the tables it creates, but not
+        those added to the models once their tables exist
+        """
+        inspector = inspect(self.__engine)
+        created = []
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            names = {index["name"]
+                     for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name not in names:
+                    index.create(self.__engine)
+                    created.append(index.name)
+        return created
+
+    def add_cascades(self):
+        """
+        makes the foreign keys of the tables of the database delete on
+        cascade where the models declare so, and returns the names of the
+        tables changed
+
+        reload() declares the foreign keys of the tables it creates, but
+        not those changed on the models once their tables exist
+        """
+        inspector = inspect(self.__engine)
+        changed = []
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            stale = []
+            for reflected in inspector.get_foreign_keys(table.name):
+                for constraint in table.foreign_key_constraints:
+                    if (constraint.ondelete is not None and
+                            reflected["constrained_columns"] ==
+                            constraint.column_keys and
+                            reflected["referred_table"] ==
+                            constraint.referred_table.name and
+                            (reflected["options"].get("ondelete") or
+                             "").upper() != constraint.ondelete.upper()):
+                        stale.append((constraint, reflected["name"]))
+            if stale:
+                self.alter_foreign_keys(self.__engine, table, stale)
+                changed.append(table.name)
+        return changed
+
+    def alter_foreign_keys(self, engine, table, stale):
+        """
+        replaces foreign keys of table in the database of engine by those
+        the models declare, stale holding pairs of a constraint of the
+        models and of the name of the foreign key it replaces
+        """
+        preparer = engine.dialect.identifier_preparer
+        with engine.begin() as conn:
+            for constraint, name in stale:
+                conn.exec_driver_sql("ALTER TABLE {} DROP FOREIGN KEY {}"
+                                     .format(preparer.format_table(table),
+                                             preparer.quote(name)))
+                conn.execute(AddConstraint(constraint))
+
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
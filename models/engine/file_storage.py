@@ -3,10 +3,22 @@
 Contains the FileStorage class
 """
 
+import atexit
+from contextlib import contextmanager
+from datetime import datetime
+import fcntl
 import json
+import logging
+import os
+from os import getenv
+import threading
+from time import monotonic, perf_counter
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine.journal import Journal
+from models.engine.rwlock import RWLock
+from models.engine.serializers import serializers
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -14,6 +26,9 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes holding the ID of a parent object
+foreign_keys = ("state_id", "city_id", "place_id", "user_id")
+logger = logging.getLogger(__name__)
 
 
 class FileStorage:
@@ -23,58 +38,864 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __by_class = {}
+    # dictionary - keys of the objects of each class by parent ID, by
+    # (<class name>, foreign key)
+    __children = {}
+    # dictionary - parent ID of each foreign key of an object, by key
+    __parents = {}
+    # dictionary - identity, mtime and size of each JSON file when last
+    # synced, by path
+    __stamps = {}
+    # dictionary - keys of the objects in each JSON file when last synced,
+    # by path
+    __on_disk = {}
+    # dictionary - identity, mtime and size of each JSON file that failed
+    # to load, by path. Those files are not written until they load
+    __broken = {}
+    # tuple - identity and size of the journal file when last synced
+    __journal_stamp = None
+    # integer - offset of the first journal entry not yet applied
+    __journal_offset = 0
+    # dictionary - serialized form of each object as last written, by key
+    __fragments = {}
+    # string - name of the format __fragments are serialized in
+    __fragments_format = None
+    # set - keys of the objects created, changed or deleted since the
+    # last save
+    __dirty = set()
+    # dictionary - records read from the JSON file but not yet built into
+    # objects, by <class name> then by key
+    __pending = {}
+    # dictionary - number of objects read by the last reload and duration
+    __reload_stats = {"objects": 0, "seconds": 0.0}
+    # integer - generation of the shared files when last synced
+    __generation = None
+    # dictionary - descriptor of each lock file opened in shared mode, by
+    # absolute path, shared by the instances using the same files
+    __lock_fds = {}
+    # RWLock - held for writing while the objects or their indexes are
+    # changed, reads of several objects go through it
+    __rwlock = RWLock()
+    # threading.RLock - held while changes are written or files are read
+    __save_lock = threading.RLock()
+    # threading.Condition - guards the counters of the flusher
+    __flush_cond = threading.Condition()
+    # threading.Thread - background thread writing requested saves, and
+    # the process it runs in
+    __flusher = None
+    __flusher_pid = None
+    # threading.Lock - held while the flusher is started
+    __flusher_lock = threading.Lock()
+    # integer - number of saves requested from the flusher, and number of
+    # those already written
+    __requested = 0
+    __flushed = 0
+    # dictionary - error raised writing the save of each ticket a save()
+    # waits for, or None, by ticket
+    __flush_errors = {}
+    # boolean - whether the flusher should write what is left and exit
+    __stopping = False
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def __init__(self):
+        """
+        Instantiate a FileStorage object
+
+        Setting HBNB_FILE_JOURNAL to 1 appends the changes made by each
+        save() to a journal next to the JSON file, which is folded back
+        into the JSON file once it grows past HBNB_FILE_JOURNAL_MAX bytes
+
+        Setting HBNB_FILE_LAZY to 1 keeps the records read by reload() as
+        they are, and only builds the object of a record the first time
+        it is retrieved
+
+        Setting HBNB_FILE_SHARDS to a directory stores the objects of each
+        class in their own <class name>.json file in that directory,
+        instead of in the JSON file
+
+        Setting HBNB_FILE_FORMAT to binary stores the objects in the
+        compact format of BinarySerializer, in .hbnb files instead of
+        .json files
+
+        Setting HBNB_FILE_SHARED to 1 lets several processes share the
+        files: save() holds an exclusive lock on a lock file next to them,
+        merges the changes of the other processes before writing and
+        bumps the generation counter kept in the lock file, and reads
+        catch up with the files whenever the counter moved
+
+        Setting HBNB_FILE_FLUSH_WINDOW to a number of seconds hands saves
+        to a background thread, which writes the saves requested within
+        that window at once, or as soon as HBNB_FILE_FLUSH_COUNT saves
+        are waiting when it is set. Requested saves are always written
+        before the process exits
+        """
+        self.__lazy = getenv("HBNB_FILE_LAZY") == "1"
+        self.__shard_dir = getenv("HBNB_FILE_SHARDS")
+        name = getenv("HBNB_FILE_FORMAT", "json")
+        if name not in serializers:
+            raise ValueError("unknown HBNB_FILE_FORMAT: {} (one of {})".format(
+                name, ", ".join(serializers)))
+        self.__serializer = serializers[name]
+        self.__path = (os.path.splitext(self.__file_path)[0] +
+                       self.__serializer.extension)
+        journal_path = self.__path + ".journal"
+        lock_path = self.__path + ".lock"
+        if self.__shard_dir:
+            os.makedirs(self.__shard_dir, exist_ok=True)
+            journal_path = os.path.join(self.__shard_dir, "journal")
+            lock_path = os.path.join(self.__shard_dir, "lock")
+        self.__lock_fd = None
+        if getenv("HBNB_FILE_SHARED") == "1":
+            lock_path = os.path.abspath(lock_path)
+            if lock_path not in FileStorage.__lock_fds:
+                FileStorage.__lock_fds[lock_path] = os.open(
+                    lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            self.__lock_fd = FileStorage.__lock_fds[lock_path]
+        self.__journal = None
+        if getenv("HBNB_FILE_JOURNAL") == "1":
+            self.__journal = Journal(journal_path)
+        self.__journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", 4194304))
+        self.__flush_window = None
+        if getenv("HBNB_FILE_FLUSH_WINDOW"):
+            self.__flush_window = float(getenv("HBNB_FILE_FLUSH_WINDOW"))
+        self.__flush_count = int(getenv("HBNB_FILE_FLUSH_COUNT", 0))
+
+    @contextmanager
+    def __locked(self, operation):
+        """
+        holds a lock of type operation (fcntl.LOCK_SH or fcntl.LOCK_EX) on
+        the lock file in shared mode, or does nothing otherwise
+        """
+        if self.__lock_fd is None:
+            yield
+            return
+        fcntl.lockf(self.__lock_fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self.__lock_fd, fcntl.LOCK_UN)
+
+    def __read_generation(self):
+        """returns the generation counter kept in the lock file"""
+        return int.from_bytes(os.pread(self.__lock_fd, 8, 0), "little")
+
+    def __catch_up(self):
+        """reloads in shared mode if another process saved since last sync"""
+        if (self.__lock_fd is not None and
+                self.__read_generation() != FileStorage.__generation):
+            with self.__save_lock, self.__locked(fcntl.LOCK_SH):
+                self.__reload()
+
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name of cls, which may be a class or a str"""
+        if isinstance(cls, str):
+            return cls
+        return cls.__name__
+
+    @staticmethod
+    def __build(record):
+        """
+        returns the object of a record read from the files, with the
+        attributes it was stored with: the password of a User, stored
+        hashed, is set as is instead of being hashed again
+        """
+        attrs = dict(record)
+        password = attrs.pop("password", None)
+        obj = classes[attrs["__class__"]](**attrs)
+        if "password" in record:
+            obj.__dict__["password"] = password
+        return obj
+
+    def __index(self, key, attrs):
+        """
+        files key under the parent IDs of the foreign keys in attrs, the
+        attributes of its object or record, or under none if attrs is None
+        """
+        parents = {}
+        if attrs is not None:
+            parents = {fk: attrs[fk] for fk in foreign_keys if attrs.get(fk)}
+        old = self.__parents.get(key, {})
+        if parents == old:
+            return
+        name = key.partition(".")[0]
+        for fk, id in old.items():
+            index = self.__children[(name, fk)]
+            index[id].pop(key, None)
+            if not index[id]:
+                del index[id]
+        for fk, id in parents.items():
+            self.__children.setdefault((name, fk), {}).setdefault(
+                id, {})[key] = None
+        if parents:
+            self.__parents[key] = parents
+        else:
+            self.__parents.pop(key, None)
+
+    def __hydrate(self, key):
+        """
+        builds and returns the object of a pending record, if any, while
+        the write lock is held
+        """
+        record = self.__pending.get(key.partition(".")[0], {}).pop(key, None)
+        if record is None:
+            return None
+        obj = self.__build(record)
+        self.new(obj)
+        self.__dirty.discard(key)
+        return obj
+
+    def __hydrate_class(self, name):
+        """builds the objects of every pending record of a class"""
+        if self.__pending.get(name):
+            with self.__rwlock.write():
+                for key in list(self.__pending.get(name, {})):
+                    self.__hydrate(key)
+
+    def __resolve(self, keys):
+        """
+        returns the objects of keys that are in storage, in order, building
+        the objects of pending records first
+        """
+        objs = self.__rwlock.read(
+            lambda: [self.__objects.get(key) for key in keys])
+        if None in objs and any(
+                key in self.__pending.get(key.partition(".")[0], ())
+                for key in keys):
+            with self.__rwlock.write():
+                objs = [self.__objects.get(key) or self.__hydrate(key)
+                        for key in keys]
+        return [obj for obj in objs if obj is not None]
+
+    def all(self, cls=None, options=None):
+        """
+        returns the dictionary __objects
+
+        Given a class, returns a copy of the objects of that class, taken
+        while no other thread changes them
+
+        options is accepted for compatibility with DBStorage.all(), the
+        related objects are always at hand
+        """
+        self.__catch_up()
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = self.__class_name(cls)
+            self.__hydrate_class(name)
+            return self.__rwlock.read(
+                lambda: dict(self.__by_class.get(name, {})))
+        for name in list(self.__pending):
+            self.__hydrate_class(name)
         return self.__objects
 
+    def iter(self, cls=None, batch_size=1000):
+        """
+        Generates the objects of a given class in storage, or every
+        object, building the pending ones batch_size at a time as they
+        are reached instead of all at once
+
+        The objects are the ones in storage when iter() is called, less
+        those deleted while it runs
+        """
+        keys = self.keys(cls)
+        for start in range(0, len(keys), batch_size):
+            yield from self.__resolve(keys[start:start + batch_size])
+
+    def keys(self, cls=None):
+        """
+        returns the keys of the objects of a given class in storage, or
+        of every object, without building any pending object
+        """
+        self.__catch_up()
+        return self.__rwlock.read(self.__keys, cls)
+
+    def __keys(self, cls=None):
+        """returns the keys of the objects of a given class, see keys()"""
+        if cls is not None:
+            name = self.__class_name(cls)
+            return (list(self.__by_class.get(name, {})) +
+                    list(self.__pending.get(name, {})))
+        keys = list(self.__objects)
+        for records in self.__pending.values():
+            keys.extend(records)
+        return keys
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            name = obj.__class__.__name__
+            key = name + "." + obj.id
+            with self.__rwlock.write():
+                self.__objects[key] = obj
+                self.__by_class.setdefault(name, {})[key] = obj
+                self.__dirty.add(key)
+                self.__index(key, obj.__dict__)
 
-    def get(self, cls, id):
-        """Retrieves a specific object of a given class and ID"""
-        all_objs = self.all(cls)
-        key = cls.__name__ + "." + id
-        return (all_objs.get(key))
+    def bulk_new(self, objs):
+        """sets in __objects every object of objs, and saves them at once"""
+        for obj in objs:
+            self.new(obj)
+        self.save()
+
+    def bulk_update(self, cls, rows):
+        """
+        updates the objects of a given class from rows, dictionaries of
+        the ID of an object and of the values to set, and saves them at
+        once
+
+        updated_at is set to the current time, as BaseModel.save() does.
+        Rows of IDs that are not in storage are left out
+        """
+        now = datetime.utcnow()
+        for row in rows:
+            obj = self.get(cls, row["id"])
+            if obj is None:
+                continue
+            for key, value in row.items():
+                if key not in ("id", "__class__", "created_at",
+                               "updated_at"):
+                    setattr(obj, key, value)
+            obj.updated_at = now
+        self.save()
+
+    def mark_dirty(self, obj):
+        """records that obj changed, if it is in storage"""
+        key = obj.__class__.__name__ + "." + str(obj.__dict__.get("id"))
+        if self.__objects.get(key) is obj:
+            with self.__rwlock.write():
+                if self.__objects.get(key) is obj:
+                    self.__dirty.add(key)
+                    self.__index(key, obj.__dict__)
+
+    def get(self, cls, id, options=None):
+        """
+        Retrieves a specific object of a given class and ID
+
+        options is accepted for compatibility with DBStorage.get()
+        """
+        self.__catch_up()
+        key = self.__class_name(cls) + "." + id
+        obj = self.__objects.get(key)
+        if obj is None and key in self.__pending.get(key.partition(".")[0],
+                                                     ()):
+            with self.__rwlock.write():
+                obj = self.__objects.get(key) or self.__hydrate(key)
+        return obj
+
+    def get_many(self, cls, ids):
+        """
+        Retrieves the objects of a given class for each ID in ids, in
+        order, skipping the IDs that are not in storage
+        """
+        self.__catch_up()
+        name = self.__class_name(cls)
+        return self.__resolve([name + "." + id for id in ids])
+
+    def children(self, cls, fk, id):
+        """
+        Retrieves the objects of a given class whose foreign key fk holds
+        the given parent ID
+        """
+        self.__catch_up()
+        index = self.__children.get((self.__class_name(cls), fk), {})
+        return self.__resolve(list(index.get(id, {})))
 
     def count(self, cls=None):
         """Returns the number of objects of a given class in storage"""
-        return (len(self.all(cls)))
+        self.__catch_up()
+        if cls is not None:
+            name = self.__class_name(cls)
+            return self.__rwlock.read(
+                lambda: (len(self.__by_class.get(name, {})) +
+                         len(self.__pending.get(name, {}))))
+        return self.__rwlock.read(
+            lambda: (len(self.__objects) +
+                     sum(map(len, self.__pending.values()))))
 
-    def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+    def count_all(self):
+        """
+        Returns the number of objects of each class in storage, by class
+        name, all taken while no other thread changes them
+        """
+        self.__catch_up()
+        return self.__rwlock.read(
+            lambda: {name: (len(self.__by_class.get(name, {})) +
+                            len(self.__pending.get(name, {})))
+                     for name in classes})
+
+    def __units(self):
+        """
+        returns the paths of the JSON files objects are stored in, with
+        the name of the class each file holds, or None for all classes
+        """
+        if not self.__shard_dir:
+            return {self.__path: None}
+        return {os.path.join(self.__shard_dir,
+                             name + self.__serializer.extension): name
+                for name in classes}
+
+    def __unit(self, key):
+        """returns the path of the JSON file the object of key belongs in"""
+        if not self.__shard_dir:
+            return self.__path
+        return os.path.join(self.__shard_dir, key.partition(".")[0] +
+                            self.__serializer.extension)
+
+    @staticmethod
+    def __stamp(path):
+        """returns the identity, mtime and size of a JSON file, or None"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __fragment_cache(self):
+        """
+        returns __fragments, emptied first if it was filled in another
+        format than the one of this instance
+        """
+        if FileStorage.__fragments_format != self.__serializer.name:
+            FileStorage.__fragments = {}
+            FileStorage.__fragments_format = self.__serializer.name
+        return FileStorage.__fragments
+
+    def __snapshot(self, name):
+        """
+        returns the (key, serialized form) entries of the objects of class
+        name, or of every object if name is None, while the write lock is
+        held
+        """
+        dumps = self.__serializer.dumps
+        fragments = self.__fragment_cache()
+        keys = self.__keys(name)
+        objects = self.__objects
+        if name is not None:
+            objects = self.__by_class.get(name, {})
+        entries = []
+        for key in keys:
+            fragment = fragments.get(key)
+            if fragment is None:
+                obj = objects.get(key)
+                if obj is None:
+                    record = self.__pending[key.partition(".")[0]][key]
+                    fragment = fragments[key] = dumps(record)
+                else:
+                    fragment = fragments[key] = dumps(obj.to_dict())
+            entries.append((key, fragment))
+        return entries
+
+    def __write_snapshot(self, path, entries):
+        """writes the file at path from entries, see __snapshot()"""
+        # write to a new file and rename it over the old one, so readers
+        # never see a partial file and always see a new file identity
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        self.__serializer.write(tmp_path, entries)
+        os.replace(tmp_path, path)
+        FileStorage.__stamps[path] = self.__stamp(path)
+        FileStorage.__on_disk[path] = {key for key, _ in entries}
+
+    def save(self, wait=True):
+        """
+        serializes __objects to the JSON file (path: __file_path)
+
+        Only the objects created or changed since the last save are
+        serialized again, the serialized form of the others is reused. In
+        journal mode only their entries are written, and with one file
+        per class only the files of their classes are written.
+        When saves are handed to the flusher, waits until the changes are
+        written if wait is set, or returns right away otherwise
+        """
+        if self.__flush_window is None:
+            self.__flush()
+            return
+        if FileStorage.__flusher_pid != os.getpid():
+            self.__start_flusher()
+        with self.__flush_cond:
+            FileStorage.__requested += 1
+            ticket = FileStorage.__requested
+            if wait:
+                FileStorage.__flush_errors[ticket] = None
+            self.__flush_cond.notify_all()
+            if not wait:
+                return
+            while FileStorage.__flushed < ticket:
+                self.__flush_cond.wait()
+            error = FileStorage.__flush_errors.pop(ticket)
+        if error is not None:
+            raise error
+
+    def __start_flusher(self):
+        """starts the flusher thread of this process, unless running"""
+        with self.__flusher_lock:
+            if FileStorage.__flusher_pid == os.getpid():
+                return
+            with self.__flush_cond:
+                FileStorage.__stopping = False
+            FileStorage.__flusher = threading.Thread(
+                target=self.__run_flusher, name="FileStorage flusher",
+                daemon=True)
+            FileStorage.__flusher_pid = os.getpid()
+            FileStorage.__flusher.start()
+        atexit.register(self.__stop_flusher)
+
+    @classmethod
+    def __after_fork(cls):
+        """
+        replaces the locks and the flusher state in a forked child
+        process, where the threads of the parent that may hold them or
+        wait on them do not run
+        """
+        cls.__rwlock = RWLock()
+        cls.__save_lock = threading.RLock()
+        cls.__flush_cond = threading.Condition()
+        cls.__flusher_lock = threading.Lock()
+        cls.__flusher = cls.__flusher_pid = None
+        cls.__requested = cls.__flushed = 0
+        cls.__flush_errors = {}
+        cls.__stopping = False
+
+    def __run_flusher(self):
+        """
+        writes the requested saves, waiting up to the flush window after
+        the first one for others to join it
+        """
+        cond = self.__flush_cond
+        while True:
+            with cond:
+                while (FileStorage.__requested == FileStorage.__flushed and
+                       not FileStorage.__stopping):
+                    cond.wait()
+                if FileStorage.__requested == FileStorage.__flushed:
+                    return
+                deadline = monotonic() + self.__flush_window
+                while not FileStorage.__stopping:
+                    waiting = FileStorage.__requested - FileStorage.__flushed
+                    left = deadline - monotonic()
+                    if left <= 0 or 0 < self.__flush_count <= waiting:
+                        break
+                    cond.wait(left)
+                ticket = FileStorage.__requested
+            error = None
+            try:
+                self.__flush()
+            except Exception as e:
+                error = e
+            with cond:
+                if error is not None:
+                    for waiting in FileStorage.__flush_errors:
+                        if FileStorage.__flushed < waiting <= ticket:
+                            FileStorage.__flush_errors[waiting] = error
+                FileStorage.__flushed = ticket
+                cond.notify_all()
+
+    def __stop_flusher(self):
+        """writes the saves still requested and stops the flusher thread"""
+        if (FileStorage.__flusher is None or
+                FileStorage.__flusher_pid != os.getpid()):
+            return
+        with self.__flush_cond:
+            FileStorage.__stopping = True
+            self.__flush_cond.notify_all()
+        FileStorage.__flusher.join()
+        FileStorage.__flusher = FileStorage.__flusher_pid = None
+
+    def __flush(self):
+        """writes the changes since the last save, see save()"""
+        with self.__save_lock, self.__locked(fcntl.LOCK_EX):
+            if self.__lock_fd is None:
+                self.__save()
+                return
+            self.__reload()
+            self.__save()
+            generation = self.__read_generation() + 1
+            os.pwrite(self.__lock_fd, generation.to_bytes(8, "little"), 0)
+            FileStorage.__generation = generation
+
+    def __save(self):
+        """
+        writes the changes since the last save to the files, putting the
+        changed keys back if writing fails
+
+        The objects are serialized while the write lock is held, and the
+        files are written once it is released, so reads do not wait for
+        the disk
+        """
+        units = self.__units()
+        snapshots = {}
+        with self.__rwlock.write():
+            # the changes to files that failed to load wait until they do
+            held = {key for key in self.__dirty
+                    if self.__unit(key) in FileStorage.__broken}
+            if held:
+                logger.error("not writing %s until it loads",
+                             ", ".join(sorted(FileStorage.__broken)))
+            dirty = self.__dirty - held
+            FileStorage.__dirty = held
+            changes = self.__changes(dirty)
+            if self.__journal is None:
+                paths = {self.__unit(key) for key, _ in changes}
+                if not self.__shard_dir:
+                    paths = set(units).difference(FileStorage.__broken)
+                for path in paths:
+                    snapshots[path] = self.__snapshot(units[path])
+        try:
+            if self.__journal is None:
+                for path, entries in snapshots.items():
+                    self.__write_snapshot(path, entries)
+            else:
+                self.__append(changes, units)
+        except Exception:
+            with self.__rwlock.write():
+                self.__dirty.update(dirty)
+            raise
+
+    def __changes(self, dirty):
+        """
+        returns the (key, record) changes of the keys in dirty, with None
+        as the record of deleted objects, and caches their serialized form
+        """
+        fragments = self.__fragment_cache()
+        changes = []
+        for key in dirty:
+            obj = self.__objects.get(key)
+            if obj is None:
+                fragments.pop(key, None)
+                changes.append((key, None))
+            else:
+                record = obj.to_dict()
+                fragments[key] = self.__serializer.dumps(record)
+                changes.append((key, record))
+        return changes
+
+    def __append(self, changes, units):
+        """
+        appends changes to the journal, and folds the journal into the
+        files once it grows too large
+        """
+        self.__journal.append(
+            [(key, None if record is None else json.dumps(record))
+             for key, record in changes])
+        with self.__rwlock.write():
+            for key, record in changes:
+                on_disk = FileStorage.__on_disk.setdefault(
+                    self.__unit(key), set())
+                if record is None:
+                    on_disk.discard(key)
+                else:
+                    on_disk.add(key)
+        if (self.__journal.size() > self.__journal_max and
+                not FileStorage.__broken):
+            with self.__rwlock.write():
+                snapshots = {path: self.__snapshot(units[path])
+                             for path in units}
+            for path, entries in snapshots.items():
+                self.__write_snapshot(path, entries)
+            self.__journal.clear()
+        FileStorage.__journal_stamp = self.__journal.stamp()
+        FileStorage.__journal_offset = self.__journal.size()
+
+    def __apply(self, key, record):
+        """
+        brings the object stored under key in line with its record, unless
+        the object changed since the last save
+        """
+        obj = self.__objects.get(key)
+        pending = self.__pending.setdefault(key.partition(".")[0], {})
+        on_disk = FileStorage.__on_disk.setdefault(self.__unit(key), set())
+        if key in self.__dirty:
+            if record is None:
+                on_disk.discard(key)
+            else:
+                on_disk.add(key)
+            return
+        if record is None:
+            # the objects depending on it have their own records
+            if obj is not None:
+                self.__delete(key)
+            if pending.pop(key, None) is not None:
+                self.__index(key, None)
+            on_disk.discard(key)
+        else:
+            if obj is None and self.__lazy:
+                pending[key] = record
+                self.__index(key, record)
+            elif obj is None or obj.to_dict() != record:
+                pending.pop(key, None)
+                self.new(self.__build(record))
+            on_disk.add(key)
+        self.__dirty.discard(key)
+        FileStorage.__fragments.pop(key, None)
+
+    def __read_files(self, paths):
+        """
+        yields, for each file in paths, its path and an iterable of its
+        (key, record) pairs, which raises if the file cannot be read
+
+        The files are parsed one after the other, each one as it is
+        consumed, so that no parsed file is held in memory
+        """
+        for path in paths:
+            yield path, self.__serializer.iter_records(path)
+
+    def stats(self):
+        """returns the number and rate of objects read by the last reload"""
+        stats = dict(FileStorage.__reload_stats)
+        if stats["seconds"]:
+            stats["objects_per_second"] = stats["objects"] / stats["seconds"]
+        return {"reload": stats}
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """
+        deserializes the JSON file to __objects
+
+        Returns right away if the file did not change since it was last
+        read or written. Otherwise only the objects whose record changed
+        are rebuilt, and the objects removed from the file are dropped,
+        except for the objects changed since the last save, which are
+        kept until written.
+        In journal mode, entries appended to the journal since it was
+        last read are applied on their own.
+        The file is parsed one object at a time, so the parsed JSON is
+        never held in memory next to the objects built from it.
+        A file that cannot be read is logged and left alone: the objects
+        read from it before are kept, and it is not written again until
+        it loads
+        """
+        with self.__save_lock, self.__locked(fcntl.LOCK_SH):
+            self.__reload()
+
+    def __reload(self):
+        """
+        reads the changes made to the files since the last sync, see
+        reload()
+        """
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            generation = None
+            if self.__lock_fd is not None:
+                generation = self.__read_generation()
+            units = self.__units()
+            stamps = {path: self.__stamp(path) for path in units}
+            changed = [path for path in units
+                       if stamps[path] != FileStorage.__stamps.get(path) and
+                       stamps[path] != FileStorage.__broken.get(path)]
+            journal_stamp = None
+            if self.__journal is not None:
+                journal_stamp = self.__journal.stamp()
+            if not changed:
+                if journal_stamp == FileStorage.__journal_stamp:
+                    FileStorage.__generation = generation
+                    return
+                last = FileStorage.__journal_stamp
+                if (journal_stamp is not None and last is not None and
+                        journal_stamp[:2] == last[:2] and
+                        journal_stamp[2] >= FileStorage.__journal_offset):
+                    entries, FileStorage.__journal_offset = \
+                        self.__journal.read(FileStorage.__journal_offset)
+                    with self.__rwlock.write():
+                        for key, record in entries:
+                            self.__apply(key, record)
+                    FileStorage.__journal_stamp = journal_stamp
+                    FileStorage.__generation = generation
+                    return
+                changed = list(units)
+            start = perf_counter()
+            with self.__rwlock.write():
+                count, offset, failed = self.__read_changed(changed,
+                                                            stamps)
+            FileStorage.__reload_stats = {
+                "objects": count, "seconds": perf_counter() - start}
+            for path in changed:
+                if path in failed:
+                    FileStorage.__broken[path] = stamps[path]
+                else:
+                    FileStorage.__broken.pop(path, None)
+                    FileStorage.__stamps[path] = stamps[path]
+            FileStorage.__journal_stamp = journal_stamp
+            FileStorage.__journal_offset = offset
+            FileStorage.__generation = generation
         except Exception:
-            pass
+            logger.exception("could not reload the files")
+
+    def __read_changed(self, changed, stamps):
+        """
+        applies the records of the files in changed that exist according
+        to stamps, then the whole journal, and drops the objects no longer
+        in those files, while the write lock is held
+
+        A file that cannot be read is logged, and the objects it held
+        before are kept. Returns the number of records read, the offset
+        following the last journal entry and the paths of the files that
+        could not be read
+        """
+        count = 0
+        previous = {}
+        failed = set()
+        for path in changed:
+            previous[path] = FileStorage.__on_disk.get(path, set())
+            FileStorage.__on_disk[path] = set()
+        for path, records in self.__read_files(
+                [path for path in changed if stamps[path] is not None]):
+            try:
+                for key, record in records:
+                    self.__apply(key, record)
+                    count += 1
+            except Exception:
+                logger.exception("could not load %s, keeping the objects "
+                                 "it held and not writing it until it "
+                                 "loads", path)
+                failed.add(path)
+                FileStorage.__on_disk[path].update(previous[path])
+        offset = 0
+        if self.__journal is not None:
+            entries, offset = self.__journal.read()
+            for key, record in entries:
+                self.__apply(key, record)
+            count += len(entries)
+        for path in changed:
+            if path not in failed:
+                for key in previous[path].difference(
+                        FileStorage.__on_disk[path]):
+                    self.__apply(key, None)
+        return count, offset, failed
 
     def delete(self, obj=None):
-        """delete obj from __objects if it’s inside"""
+        """
+        delete obj from __objects if it’s inside, along with the objects
+        whose foreign key holds its ID, and theirs in turn: the cities of
+        a state, the places of a city or of a user and the reviews of a
+        place or of a user, found through the foreign key indexes
+        """
         if obj is not None:
-            key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__rwlock.write():
+                self.__delete(obj.__class__.__name__ + '.' + obj.id,
+                              cascade=True)
+
+    def __delete(self, key, cascade=False):
+        """
+        deletes the object or pending record of key, and the ones
+        depending on it when cascade is set, see delete(), while the write
+        lock is held
+        """
+        name, _, id = key.partition(".")
+        fk = name.lower() + "_id"
+        if cascade and fk in foreign_keys:
+            for (child, child_fk), index in list(self.__children.items()):
+                if child_fk == fk:
+                    for child_key in list(index.get(id, ())):
+                        self.__delete(child_key, cascade)
+        if key in self.__objects:
+            del self.__objects[key]
+            self.__dirty.add(key)
+        if self.__pending.get(name, {}).pop(key, None) is not None:
+            self.__dirty.add(key)
+        self.__index(key, None)
+        self.__by_class.get(name, {}).pop(key, None)
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
         self.reload()
+
+
+# the locks of a forked child may be held by threads it does not have
+os.register_at_fork(after_in_child=FileStorage._FileStorage__after_fork)
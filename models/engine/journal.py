@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Contains the Journal class
+"""
+
+import json
+import os
+
+
+class Journal:
+    """
+    append-only log of the records changed since the last snapshot
+
+    Each line is a JSON array holding a key and either its record or
+    null when the object was deleted
+    """
+
+    def __init__(self, path):
+        """Instantiate a Journal writing to the file at path"""
+        self.path = path
+
+    def append(self, entries):
+        """
+        appends entries, a list of (key, fragment) tuples where fragment
+        is the JSON text of the record, or None for a deletion
+        """
+        lines = []
+        for key, fragment in entries:
+            if fragment is None:
+                fragment = "null"
+            lines.append("[" + json.dumps(key) + ", " + fragment + "]\n")
+        if lines:
+            with open(self.path, "ab+") as f:
+                # an interrupted append may have left a partial line
+                # behind, keep it on a line of its own
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        lines.insert(0, "\n")
+                f.write("".join(lines).encode())
+
+    def read(self, offset=0):
+        """
+        returns the (key, record) entries written after offset, and the
+        offset following the last complete entry
+
+        A trailing line without a newline, left by an interrupted
+        append, is not returned
+        """
+        entries = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        key, record = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries.append((key, record))
+        except FileNotFoundError:
+            pass
+        return entries, offset
+
+    def stamp(self):
+        """returns the identity and size of the journal file, or None"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_size)
+
+    def size(self):
+        """returns the size of the journal file in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def clear(self):
+        """removes every entry, once they are folded into a snapshot"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
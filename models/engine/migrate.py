@@ -0,0 +1,23 @@
+#!/usr/bin/python3
+"""
+Adds the indexes declared on the models to an existing database, the one
+the environment selects as for the other scripts, and makes its foreign
+keys delete on cascade as the models declare
+
+Usage: HBNB_TYPE_STORAGE=db HBNB_MYSQL_USER=... \
+       python3 -m models.engine.migrate
+"""
+import sys
+import models
+
+if __name__ == "__main__":
+    if models.storage_t != "db":
+        sys.exit("no database selected by HBNB_TYPE_STORAGE")
+    created = models.storage.add_indexes()
+    for name in created:
+        print("created index {}".format(name))
+    print("{} index(es) created".format(len(created)))
+    changed = models.storage.add_cascades()
+    for name in changed:
+        print("made the foreign keys of {} cascade".format(name))
+    print("{} table(s) changed".format(len(changed)))
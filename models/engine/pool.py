@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Contains the connection pools of the database storage engines
+"""
+
+import threading
+from time import perf_counter
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class TimedPool:
+    """
+    mixin of a SQLAlchemy pool counting the connections handed out and
+    the time spent waiting for them
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate the pool, with no connection handed out yet"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__checkouts = 0
+        self.__wait = 0.0
+        self.__max_wait = 0.0
+
+    def connect(self):
+        """
+        returns a connection from the pool, counting the time taken to
+        get it, including opening a new one
+        """
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait = perf_counter() - start
+            with self.__lock:
+                self.__checkouts += 1
+                self.__wait += wait
+                self.__max_wait = max(self.__max_wait, wait)
+
+    def stats(self):
+        """
+        returns a dictionary of the pool statistics: its class, the
+        number of connections handed out since it was created, the total
+        and longest time spent waiting for one
+        """
+        with self.__lock:
+            return {"pool": type(self).__name__, "checkouts": self.__checkouts,
+                    "wait_seconds": self.__wait,
+                    "max_wait_seconds": self.__max_wait}
+
+
+class TimedQueuePool(TimedPool, QueuePool):
+    """QueuePool keeping statistics, see TimedPool"""
+
+    def stats(self):
+        """
+        returns a dictionary of the pool statistics, see TimedPool, with
+        the number of connections kept open (size), in use (checked_out),
+        idle (checked_in) and opened past the size (overflow)
+        """
+        stats = super().stats()
+        stats.update({"size": self.size(), "checked_out": self.checkedout(),
+                      "checked_in": self.checkedin(),
+                      "overflow": max(self.overflow(), 0)})
+        return stats
+
+
+class TimedNullPool(TimedPool, NullPool):
+    """NullPool keeping statistics, opening a connection for each use"""
+
+
+pools = {"queue": TimedQueuePool, "null": TimedNullPool}
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Contains the RoutingSession class
+"""
+
+import random
+from sqlalchemy.orm import Session
+
+
+class RoutingSession(Session):
+    """
+    session reading from a replica of the database and writing to the
+    primary one
+
+    The session reads from one replica, picked at random the first time
+    it reads. Once it writes, or once stick() is called, it reads from
+    the primary too, so it sees its own writes, until it is closed
+    """
+
+    def __init__(self, replicas=(), **kwargs):
+        """
+        Instantiate a RoutingSession writing to the engine bound as bind
+        and reading from one of the engines of replicas
+        """
+        super().__init__(**kwargs)
+        self.replicas = list(replicas)
+
+    def stick(self):
+        """sends every following statement to the primary database"""
+        self.info["primary"] = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """returns the engine a statement of the session is run on"""
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if not self.replicas or self.info.get("primary"):
+            return primary
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.stick()
+            return primary
+        if "replica" not in self.info:
+            self.info["replica"] = random.choice(self.replicas)
+        return self.info["replica"]
+
+    def close(self):
+        """closes the session, which reads from a replica again"""
+        super().close()
+        self.info.pop("primary", None)
+        self.info.pop("replica", None)
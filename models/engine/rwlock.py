@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock class
+"""
+
+import threading
+
+
+class RWLock:
+    """
+    reader/writer lock where readers do not lock
+
+    Writers hold a reentrant lock, and bump a version number when they
+    take it and when they release it, so the version is odd while a
+    writer holds the lock. A reader runs without locking and keeps its
+    result if the version was even and did not change meanwhile, and
+    otherwise runs again while holding the lock, so it never sees the
+    half-done work of a writer
+    """
+
+    def __init__(self):
+        """Instantiate an unlocked RWLock"""
+        self.__lock = threading.RLock()
+        # integer - number of times the holder of the lock took it
+        self.__depth = 0
+        # integer - bumped when a writer takes or releases the lock
+        self.version = 0
+
+    def __enter__(self):
+        """takes the lock for writing"""
+        self.__lock.acquire()
+        self.__depth += 1
+        if self.__depth == 1:
+            self.version += 1
+
+    def __exit__(self, *exc):
+        """releases the lock taken for writing"""
+        self.__depth -= 1
+        if not self.__depth:
+            self.version += 1
+        self.__lock.release()
+
+    def write(self):
+        """returns a context manager holding the lock for writing"""
+        return self
+
+    def read(self, function, *args):
+        """
+        returns the result of function called with args, as seen between
+        two writes
+        """
+        version = self.version
+        if not version & 1:
+            try:
+                result = function(*args)
+            except RuntimeError:
+                # a dictionary changed size while function iterated it
+                pass
+            else:
+                if self.version == version:
+                    return result
+        with self.__lock:
+            return function(*args)
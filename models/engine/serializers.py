@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+"""
+Contains the JSONSerializer and BinarySerializer classes, the on-disk
+formats FileStorage can use
+
+Both read and write a file of records by key, where a record is the
+dictionary returned by to_dict(). A file can be converted from one
+format to the other with:
+    python3 -m models.engine.serializers <source> <destination>
+the format of each file being picked from its extension
+"""
+
+from datetime import datetime, timedelta
+import json
+from json.decoder import WHITESPACE
+import marshal
+import os
+import sys
+
+time = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class JSONSerializer:
+    """reads and writes records as one JSON object, by key"""
+
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, record):
+        """returns the JSON text of a record"""
+        return json.dumps(record)
+
+    def write(self, path, entries):
+        """
+        writes the file at path from entries, a list of (key, text)
+        tuples where text was returned by dumps()
+        """
+        with open(path, 'w') as f:
+            f.write("{")
+            f.write(", ".join(json.dumps(key) + ": " + text
+                              for key, text in entries))
+            f.write("}")
+
+    def iter_records(self, path, chunk_size=1 << 20):
+        """
+        yields the (key, record) pairs of the file at path one at a time,
+        reading it by chunks of chunk_size characters
+        """
+        decode = json.JSONDecoder().raw_decode
+        buf = ""
+        pos = 0
+        eof = False
+        expect = "{"
+        with open(path, 'r') as f:
+            while True:
+                pos = WHITESPACE.match(buf, pos).end()
+                if pos == len(buf) and not eof:
+                    buf, pos = f.read(chunk_size), 0
+                    eof = buf == ""
+                    continue
+                if expect in ("key", "value"):
+                    try:
+                        value, end = decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        chunk = f.read(chunk_size)
+                        buf, pos, eof = buf[pos:] + chunk, 0, chunk == ""
+                        continue
+                    pos = end
+                    if expect == "key":
+                        key, expect = value, ":"
+                    else:
+                        yield key, value
+                        expect = ","
+                    continue
+                char = buf[pos:pos + 1]
+                pos += 1
+                if char == "}" and expect in ("first", ","):
+                    return
+                if char == "{" and expect == "{":
+                    expect = "first"
+                elif char == '"' and expect == "first":
+                    pos -= 1
+                    expect = "key"
+                elif char == ":" and expect == ":":
+                    expect = "value"
+                elif char == "," and expect == ",":
+                    expect = "key"
+                else:
+                    raise ValueError(
+                        "Expecting '{}' at {}".format(expect, pos))
+
+
+class BinarySerializer:
+    """
+    reads and writes records as length-prefixed marshal frames
+
+    The file starts with a header holding a magic string, the version of
+    this format and the marshal version. Files of an older marshal version
+    are read as well, marshal reading the output of its older versions,
+    but not those of a newer one. Each frame holds the class name,
+    the id, created_at and updated_at as microseconds since the epoch,
+    and the other attributes of one record
+    """
+
+    name = "binary"
+    extension = ".hbnb"
+    version = 1
+    header = b"HBNB" + bytes([version, marshal.version])
+    epoch = datetime(1970, 1, 1)
+    tick = timedelta(microseconds=1)
+    # dictionary - formatted date of each day since the epoch seen
+    days = {}
+
+    @classmethod
+    def __to_int(cls, value):
+        """returns the microseconds since the epoch of a to_dict() date"""
+        if value is None:
+            return None
+        return (datetime.fromisoformat(value) - cls.epoch) // cls.tick
+
+    @classmethod
+    def __to_str(cls, value):
+        """returns the to_dict() date of microseconds since the epoch"""
+        seconds, micro = divmod(value, 1000000)
+        days, seconds = divmod(seconds, 86400)
+        # formatting a datetime is slow, only the date part of each day
+        # seen is formatted, the time of day is formatted from integers
+        day = cls.days.get(days)
+        if day is None:
+            day = cls.days[days] = (
+                cls.epoch + timedelta(days=days)).strftime("%Y-%m-%dT")
+        return "%s%02d:%02d:%02d.%06d" % (day, seconds // 3600,
+                                          seconds // 60 % 60, seconds % 60,
+                                          micro)
+
+    def dumps(self, record):
+        """returns the frame of a record"""
+        attrs = dict(record)
+        payload = marshal.dumps((attrs.pop("__class__"), attrs.pop("id"),
+                                 self.__to_int(attrs.pop("created_at", None)),
+                                 self.__to_int(attrs.pop("updated_at", None)),
+                                 attrs), marshal.version)
+        return len(payload).to_bytes(4, "little") + payload
+
+    def write(self, path, entries):
+        """
+        writes the file at path from entries, a list of (key, frame)
+        tuples where frame was returned by dumps()
+        """
+        with open(path, 'wb') as f:
+            f.write(self.header)
+            f.write(b"".join(frame for key, frame in entries))
+
+    def iter_records(self, path, chunk_size=1 << 20):
+        """
+        yields the (key, record) pairs of the file at path one at a time,
+        reading it by chunks of chunk_size bytes
+        """
+        loads = marshal.loads
+        to_str = self.__to_str
+        with open(path, 'rb') as f:
+            header = f.read(len(self.header))
+            if (len(header) != len(self.header) or
+                    header[:-1] != self.header[:-1]):
+                raise ValueError("{} is not a version {} file".format(
+                    path, self.version))
+            if header[-1] > marshal.version:
+                raise ValueError(
+                    "{} holds marshal version {} data, newer than {}".format(
+                        path, header[-1], marshal.version))
+            buf = b""
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    if buf:
+                        raise ValueError("truncated frame in " + path)
+                    return
+                buf += chunk
+                pos = 0
+                end = len(buf)
+                while pos + 4 <= end:
+                    size = int.from_bytes(buf[pos:pos + 4], "little")
+                    if pos + 4 + size > end:
+                        break
+                    name, id, created_at, updated_at, record = loads(
+                        buf[pos + 4:pos + 4 + size])
+                    pos += 4 + size
+                    record["id"] = id
+                    if created_at is not None:
+                        record["created_at"] = to_str(created_at)
+                    if updated_at is None:
+                        pass
+                    elif updated_at == created_at:
+                        record["updated_at"] = record["created_at"]
+                    else:
+                        record["updated_at"] = to_str(updated_at)
+                    record["__class__"] = name
+                    yield name + "." + id, record
+                buf = buf[pos:]
+
+
+serializers = {"json": JSONSerializer(), "binary": BinarySerializer()}
+
+
+def serializer_for(path):
+    """returns the serializer matching the extension of path"""
+    for serializer in serializers.values():
+        if path.endswith(serializer.extension):
+            return serializer
+    raise ValueError("no format uses the extension of " + path)
+
+
+def convert(source, destination):
+    """
+    writes the records of the file at source to the file at destination,
+    in the format matching the extension of each path
+    """
+    reader = serializer_for(source)
+    writer = serializer_for(destination)
+    entries = [(key, writer.dumps(record))
+               for key, record in reader.iter_records(source)]
+    tmp_path = "{}.{}.tmp".format(destination, os.getpid())
+    writer.write(tmp_path, entries)
+    os.replace(tmp_path, destination)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: {} <source> <destination>".format(sys.argv[0]))
+        sys.exit(1)
+    print("{} records converted".format(convert(sys.argv[1], sys.argv[2])))
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.base_model import Base
+from models.engine.db_storage import DBStorage
+from os import getenv
+from sqlalchemy import MetaData, event
+from sqlalchemy.schema import CreateTable
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with a SQLite database file, with the DBStorage models"""
+    # dictionary - pragmas set on every new connection: write-ahead
+    # logging so readers do not block the writer, fsync at checkpoints
+    # only, enforced foreign keys, waiting on a locked database instead
+    # of failing, and a larger page cache and memory map
+    pragmas = {"journal_mode": "WAL", "synchronous": "NORMAL",
+               "foreign_keys": "ON", "busy_timeout": 5000,
+               "cache_size": -16000, "temp_store": "MEMORY",
+               "mmap_size": 268435456}
+
+    def url(self):
+        """
+        returns the URL of the SQLite database file at HBNB_SQLITE_DB
+        (hbnb.db by default)
+        """
+        return "sqlite:///" + getenv("HBNB_SQLITE_DB", "hbnb.db")
+
+    def make_engine(self, url):
+        """returns the engine connecting to the SQLite database at url"""
+        engine = super().make_engine(url)
+        event.listen(engine, "connect", self.set_pragmas)
+        return engine
+
+    def set_pragmas(self, dbapi_connection, connection_record):
+        """sets the pragmas on a new connection to the database"""
+        cursor = dbapi_connection.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute("PRAGMA {} = {}".format(name, value))
+        cursor.close()
+
+    def alter_foreign_keys(self, engine, table, stale):
+        """
+        replaces the foreign keys of table by those the models declare,
+        see DBStorage.alter_foreign_keys()
+
+        SQLite cannot alter the constraints of a table, so the table is
+        rebuilt instead: created as the models declare it under another
+        name, filled with the rows of the table, which is dropped, then
+        renamed, with its indexes created again. Foreign keys are not
+        enforced meanwhile, so dropping the table deletes no other row
+        """
+        metadata = MetaData()
+        for other in Base.metadata.sorted_tables:
+            other.to_metadata(metadata, name=(
+                "_new_" + other.name if other is table else None))
+        new = metadata.tables["_new_" + table.name]
+        columns = ", ".join(column.name for column in table.columns)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            try:
+                conn.exec_driver_sql("DROP TABLE IF EXISTS " + new.name)
+                conn.execute(CreateTable(new))
+                conn.exec_driver_sql("INSERT INTO {} ({}) SELECT {} FROM {}"
+                                     .format(new.name, columns, columns,
+                                             table.name))
+                conn.exec_driver_sql("DROP TABLE " + table.name)
+                conn.exec_driver_sql("ALTER TABLE {} RENAME TO {}"
+                                     .format(new.name, table.name))
+                for index in table.indexes:
+                    index.create(conn)
+                conn.commit()
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+                conn.commit()
@@ -11,8 +11,12 @@ class Review(BaseModel, Base):
     """Representation of Review """
     if models.storage_t == 'db':
         __tablename__ = 'reviews'
-        place_id = Column(String(60), ForeignKey('places.id'), nullable=False)
-        user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+        place_id = Column(String(60),
+                          ForeignKey('places.id', ondelete='CASCADE'),
+                          nullable=False, index=True)
+        user_id = Column(String(60),
+                         ForeignKey('users.id', ondelete='CASCADE'),
+                         nullable=False, index=True)
         text = Column(String(1024), nullable=False)
     else:
         place_id = ""
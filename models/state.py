@@ -13,9 +13,10 @@ class State(BaseModel, Base):
     """Representation of state """
     if models.storage_t == "db":
         __tablename__ = 'states'
-        name = Column(String(128), nullable=False)
-        cities = relationship("City", backref="state", 
-                              cascade="all, delete, delete-orphan")
+        name = Column(String(128), nullable=False, index=True)
+        cities = relationship("City", backref="state",
+                              cascade="all, delete, delete-orphan",
+                              passive_deletes=True)
     else:
         name = ""
 
@@ -27,9 +28,4 @@ class State(BaseModel, Base):
         @property
         def cities(self):
             """getter for list of city instances related to the state"""
-            city_list = []
-            all_cities = models.storage.all(City)
-            for city in all_cities.values():
-                if city.state_id == self.id:
-                    city_list.append(city)
-            return city_list
+            return models.storage.children(City, "state_id", self.id)
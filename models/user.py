@@ -13,14 +13,16 @@ class User(BaseModel, Base):
     """Representation of a user """
     if models.storage_t == 'db':
         __tablename__ = 'users'
-        email = Column(String(128), nullable=False)
+        email = Column(String(128), nullable=False, index=True)
         password = Column(String(128), nullable=False)
         first_name = Column(String(128), nullable=True)
         last_name = Column(String(128), nullable=True)
         places = relationship("Place", backref="user",
-                              cascade="all, delete, delete-orphan")
+                              cascade="all, delete, delete-orphan",
+                              passive_deletes=True)
         reviews = relationship("Review", backref="user",
-                               cascade="all, delete, delete-orphan")
+                               cascade="all, delete, delete-orphan",
+                               passive_deletes=True)
     else:
         email = ""
         password = ""
@@ -40,3 +42,16 @@ class User(BaseModel, Base):
         if name == 'password':
             value = hashlib.md5(value.encode()).hexdigest()
         super().__setattr__(name, value)
+
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter for list of place instances owned by the user"""
+            from models.place import Place
+            return models.storage.children(Place, "user_id", self.id)
+
+        @property
+        def reviews(self):
+            """getter for list of review instances written by the user"""
+            from models.review import Review
+            return models.storage.children(Review, "user_id", self.id)
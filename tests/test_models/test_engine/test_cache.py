@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""
+Contains the TestQueryCacheDocs and TestQueryCache classes
+"""
+
+import inspect
+from models.engine import cache
+import pep8
+import time
+import unittest
+QueryCache = cache.QueryCache
+
+
+class TestQueryCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of QueryCache class"""
+    def test_pep8_conformance_cache(self):
+        """Test that models/engine/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_cache(self):
+        """Test tests/test_models/test_engine/test_cache.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache.__doc__, None,
+                         "cache.py needs a docstring")
+        self.assertTrue(len(cache.__doc__) >= 1,
+                        "cache.py needs a docstring")
+
+    def test_cache_class_docstring(self):
+        """Test for the QueryCache class docstring"""
+        self.assertIsNot(QueryCache.__doc__, None,
+                         "QueryCache class needs a docstring")
+
+    def test_cache_func_docstrings(self):
+        """Test for the presence of docstrings in QueryCache methods"""
+        for name, func in inspect.getmembers(QueryCache, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} method needs a docstring".format(name))
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test the QueryCache class"""
+    def test_get_put(self):
+        """Test that a recorded result is found, counting hits and misses"""
+        results = QueryCache()
+        self.assertEqual(results.get("states"), (False, None))
+        results.put("states", {"states"}, [1, 2])
+        self.assertEqual(results.get("states"), (True, [1, 2]))
+        stats = results.stats()
+        self.assertEqual([stats["entries"], stats["hits"], stats["misses"]],
+                         [1, 1, 1])
+
+    def test_lru(self):
+        """Test that the least recently used result makes room"""
+        results = QueryCache(size=2)
+        results.put("a", {"states"}, 1)
+        results.put("b", {"states"}, 2)
+        results.get("a")
+        results.put("c", {"states"}, 3)
+        self.assertEqual(results.get("b"), (False, None))
+        self.assertEqual(results.get("a"), (True, 1))
+        self.assertEqual(results.get("c"), (True, 3))
+        self.assertEqual(results.stats()["evictions"], 1)
+
+    def test_ttl(self):
+        """Test that results expire"""
+        results = QueryCache(ttl=0.05)
+        results.put("a", {"states"}, 1)
+        time.sleep(0.1)
+        self.assertEqual(results.get("a"), (False, None))
+        stats = results.stats()
+        self.assertEqual([stats["entries"], stats["expirations"]], [0, 1])
+
+    def test_invalidate(self):
+        """Test that only the results read from a changed table are
+        dropped"""
+        results = QueryCache()
+        results.put("states", {"states"}, 1)
+        results.put("cities", {"cities"}, 2)
+        results.put("states.cities", {"states", "cities"}, 3)
+        results.invalidate({"cities"})
+        self.assertEqual(results.get("states"), (True, 1))
+        self.assertEqual(results.get("cities"), (False, None))
+        self.assertEqual(results.get("states.cities"), (False, None))
+        self.assertEqual(results.stats()["invalidations"], 2)
+
+    def test_put_after_invalidate(self):
+        """Test that a result read before its table changed is not
+        recorded"""
+        results = QueryCache()
+        version = results.version()
+        results.invalidate({"states"})
+        results.put("states", {"states"}, 1, version)
+        results.put("cities", {"cities"}, 2, version)
+        self.assertEqual(results.get("states"), (False, None))
+        self.assertEqual(results.get("cities"), (True, 2))
+
+    def test_invalidations_bounded(self):
+        """Test that only the last invalidations of size tables are
+        remembered, the results read before older ones not being
+        recorded"""
+        results = QueryCache(size=4)
+        first = results.version()
+        for i in range(2000):
+            results.invalidate({("states", str(i))})
+        self.assertEqual(len(results._QueryCache__changed), 4)
+        version = results.version()
+        results.put("old", {"cities"}, 1, first)
+        results.put("new", {("states", "1999")}, 2, version)
+        self.assertEqual(results.get("old"), (False, None))
+        self.assertEqual(results.get("new"), (True, 2))
@@ -90,5 +90,21 @@ class TestFileStorage(unittest.TestCase):
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_get_and_count(self):
         """Tests the get and count method of DBStorage instances"""
-        storage = DBStorage()
+        storage = type(models.storage)()
         storage.reload()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_count_all(self):
+        """Test that count_all returns the count of every class"""
+        state = State(name="Nevada")
+        state.save()
+        counts = models.storage.count_all()
+        self.assertEqual(set(counts), set(classes))
+        self.assertGreaterEqual(counts["State"], 1)
+        for name in counts:
+            self.assertEqual(counts[name], models.storage.count(name))
+            self.assertEqual(counts[name],
+                             len(models.storage.all(classes[name])))
+        self.assertEqual(sum(counts.values()), models.storage.count())
+        models.storage.delete(state)
+        models.storage.save()
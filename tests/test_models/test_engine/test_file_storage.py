@@ -4,9 +4,12 @@ Contains the TestFileStorageDocs classes
 """
 
 from datetime import datetime
+import hashlib
 import inspect
 import models
 from models.engine import file_storage
+from models.engine.journal import Journal
+from models.engine.serializers import BinarySerializer
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -15,9 +18,15 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
+import multiprocessing
 import os
 import pep8
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -129,3 +138,765 @@ class TestFileStorage(unittest.TestCase):
 
         self.assertTrue(new_state is storage.get(State, new_state.id))
         self.assertIsNone(storage.get(State, "Non-existent-ID"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_options(self):
+        """Test that all and get accept and ignore loading options"""
+        storage = FileStorage()
+        state = State(name="Idaho")
+        storage.new(state)
+        options = {"cities": "selectin"}
+        self.assertEqual(storage.all(State, options=options),
+                         storage.all(State))
+        self.assertIs(storage.get(State, state.id, options=options), state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter(self):
+        """Test that iter generates the objects of a class by batches"""
+        storage = FileStorage()
+        states = [State(name="State {}".format(i)) for i in range(5)]
+        for state in states:
+            storage.new(state)
+        for batch_size in [1, 2, 1000]:
+            with self.subTest(batch_size=batch_size):
+                found = list(storage.iter(State, batch_size=batch_size))
+                self.assertEqual(found, list(storage.all(State).values()))
+        found = storage.iter(State, batch_size=2)
+        first = next(found)
+        storage.delete(states[-1])
+        self.assertNotIn(states[-1], [first] + list(found))
+        self.assertEqual(len(list(storage.iter())), storage.count())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk_new_and_update(self):
+        """Test that bulk_new and bulk_update save every object at once"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir}):
+                storage = FileStorage()
+            states = [State(name="State {}".format(i)) for i in range(3)]
+            with mock.patch.object(FileStorage, "save",
+                                   autospec=True,
+                                   side_effect=FileStorage.save) as save:
+                storage.bulk_new(states)
+                self.assertEqual(save.call_count, 1)
+                updated_at = states[0].updated_at
+                storage.bulk_update(State, [
+                    {"id": states[0].id, "name": "First",
+                     "created_at": "2000-01-01T00:00:00.000000"},
+                    {"id": states[1].id, "name": "Second"},
+                    {"id": "missing", "name": "Nowhere"}])
+                self.assertEqual(save.call_count, 2)
+            self.assertEqual([state.name for state in states],
+                             ["First", "Second", "State 2"])
+            self.assertGreater(states[0].updated_at, updated_at)
+            self.assertIsInstance(states[0].created_at, datetime)
+            self.assertIsNone(storage.get(State, "missing"))
+            with open(os.path.join(shard_dir, "State.json"), "r") as f:
+                saved = json.load(f)
+            for state in states:
+                self.assertEqual(saved["State." + state.id]["name"],
+                                 state.name)
+                storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_count_all(self):
+        """Test that count_all returns the count of every class"""
+        storage = FileStorage()
+        storage.new(State(name="Nevada"))
+        counts = storage.count_all()
+        self.assertEqual(set(counts), set(classes))
+        for name in counts:
+            self.assertEqual(counts[name], storage.count(name))
+        self.assertEqual(sum(counts.values()), storage.count())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_by_class(self):
+        """Test that all(cls) only returns objects of the given class"""
+        storage = FileStorage()
+        state = State(name="Oregon")
+        city = City(name="Portland", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        for cls in [State, "State"]:
+            with self.subTest(cls=cls):
+                states = storage.all(cls)
+                self.assertIn("State." + state.id, states)
+                self.assertNotIn("City." + city.id, states)
+                for obj in states.values():
+                    self.assertIs(type(obj), State)
+                self.assertEqual(len(states), storage.count(cls))
+        self.assertIsNot(storage.all(State), storage.all(State))
+        storage.delete(state)
+        storage.delete(city)
+        self.assertNotIn("State." + state.id, storage.all(State))
+        self.assertNotIn("City." + city.id, storage.all())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_many(self):
+        """Tests the get_many method of FileStorage instances"""
+        storage = FileStorage()
+        first = Amenity(name="Wifi")
+        second = Amenity(name="Pool")
+        storage.new(first)
+        storage.new(second)
+        found = storage.get_many(Amenity, [second.id, "Non-existent-ID",
+                                           first.id])
+        self.assertEqual(found, [second, first])
+        self.assertEqual(storage.get_many("Amenity", [first.id]), [first])
+        self.assertEqual(storage.get_many(State, [first.id]), [])
+        self.assertIs(storage.get("Amenity", first.id), first)
+        storage.delete(first)
+        storage.delete(second)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_only_changes(self):
+        """Test that reload only rebuilds objects changed in file.json"""
+        storage = FileStorage()
+        kept = State(name="Texas")
+        changed = State(name="Ohio")
+        removed = State(name="Utah")
+        for state in [kept, changed, removed]:
+            storage.new(state)
+        storage.save()
+        storage.reload()
+        self.assertIs(storage.get(State, changed.id), changed)
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + changed.id]["name"] = "Oklahoma"
+        del js["State." + removed.id]
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.reload()
+        self.assertIs(storage.get(State, kept.id), kept)
+        self.assertEqual(storage.get(State, changed.id).name, "Oklahoma")
+        self.assertIsNone(storage.get(State, removed.id))
+        storage.delete(kept)
+        storage.delete(storage.get(State, changed.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_journal(self):
+        """Test that saves are appended to a journal in journal mode"""
+        env = {"HBNB_FILE_JOURNAL": "1", "HBNB_FILE_JOURNAL_MAX": "100000"}
+        with mock.patch.dict(os.environ, env):
+            storage = FileStorage()
+        journal = Journal("file.json.journal")
+        state = State(name="Nevada")
+        key = "State." + state.id
+        storage.new(state)
+        storage.save()
+        _, offset = journal.read()
+        state.name = "Kansas"
+        storage.save()
+        self.assertEqual(journal.read(offset)[0],
+                         [(key, state.to_dict())])
+        # rebuild everything from file.json and the journal
+        del FileStorage._FileStorage__objects[key]
+        del FileStorage._FileStorage__by_class["State"][key]
+        FileStorage._FileStorage__stamps = {}
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Kansas")
+        # compaction folds the journal into file.json
+        with mock.patch.dict(os.environ, {"HBNB_FILE_JOURNAL": "1",
+                                          "HBNB_FILE_JOURNAL_MAX": "0"}):
+            storage = FileStorage()
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as f:
+            self.assertNotIn(key, json.load(f))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_only_dirty(self):
+        """Test that save only serializes objects changed since last save"""
+        storage = FileStorage()
+        state = State(name="Maine")
+        storage.new(state)
+        storage.save()
+        # bypasses attribute assignment, so the change goes unnoticed
+        state.__dict__["name"] = "Vermont"
+        storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(json.load(f)["State." + state.id]["name"],
+                             "Maine")
+        state.name = "Alaska"
+        storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(json.load(f)["State." + state.id]["name"],
+                             "Alaska")
+        storage.delete(state)
+        storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn("State." + state.id, json.load(f))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_streams_file(self):
+        """Test that reload reads a file.json written with any layout"""
+        storage = FileStorage()
+        state = State(name="Idaho")
+        city = City(name="Boise", state_id=state.id)
+        js = {"State." + state.id: state.to_dict(),
+              "City." + city.id: city.to_dict()}
+        with open("file.json", "w") as f:
+            json.dump(js, f, indent=4)
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Idaho")
+        self.assertEqual(storage.get(City, city.id).state_id, state.id)
+        stats = storage.stats()["reload"]
+        self.assertEqual(stats["objects"], 2)
+        self.assertGreater(stats["objects_per_second"], 0)
+        with open("file.json", "w") as f:
+            json.dump({}, f)
+        storage.reload()
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_lazy(self):
+        """Test that objects are only built when retrieved in lazy mode"""
+        storage = FileStorage()
+        state = State(name="Georgia")
+        places = [Place(name="Cabin"), Place(name="Loft")]
+        user = User(email="a@b.c", password="secret")
+        js = {"State." + state.id: state.to_dict(),
+              "User." + user.id: user.to_dict()}
+        for place in places:
+            js["Place." + place.id] = place.to_dict()
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        with mock.patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            storage = FileStorage()
+        storage.reload()
+        objects = storage._FileStorage__objects
+        self.assertNotIn("State." + state.id, objects)
+        self.assertIn("State." + state.id, storage.keys(State))
+        self.assertIn("Place." + places[0].id, storage.keys())
+        self.assertEqual(storage.count(Place), len(storage.keys(Place)))
+        self.assertNotIn("Place." + places[0].id, objects)
+        self.assertEqual(storage.get(State, state.id).name, "Georgia")
+        self.assertIn("State." + state.id, objects)
+        self.assertNotIn("Place." + places[0].id, objects)
+        self.assertIn("Place." + places[1].id, storage.all(Place))
+        self.assertIn("Place." + places[1].id, objects)
+        self.assertEqual(storage.get(User, user.id).password, user.password)
+        storage.save()
+        self.assertIn("Place." + places[0].id,
+                      storage._FileStorage__fragments)
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        for key in js:
+            self.assertEqual(saved[key], js[key])
+        with open("file.json", "w") as f:
+            json.dump({}, f)
+        storage.reload()
+        self.assertNotIn("Place." + places[0].id, storage.keys())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_children(self):
+        """Test that children follows new, delete and foreign key changes"""
+        storage = FileStorage()
+        ohio = State(name="Ohio")
+        utah = State(name="Utah")
+        akron = City(name="Akron", state_id=ohio.id)
+        provo = City(name="Provo", state_id=ohio.id)
+        for obj in [ohio, utah, akron, provo]:
+            storage.new(obj)
+        self.assertEqual(storage.children(City, "state_id", ohio.id),
+                         [akron, provo])
+        self.assertEqual(ohio.cities, [akron, provo])
+        provo.state_id = utah.id
+        self.assertEqual(storage.children("City", "state_id", ohio.id),
+                         [akron])
+        self.assertEqual(utah.cities, [provo])
+        storage.delete(akron)
+        self.assertEqual(ohio.cities, [])
+        place = Place(name="Chalet", city_id=provo.id,
+                      amenity_ids=["missing"])
+        storage.new(place)
+        self.assertEqual(provo.places, [place])
+        self.assertEqual(place.amenities, [])
+        for obj in [ohio, utah, provo, place]:
+            storage.delete(obj)
+        self.assertEqual(storage.children(City, "state_id", utah.id), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_children_lazy(self):
+        """Test that children includes records not yet built in lazy mode"""
+        state = State(name="Oregon")
+        city = City(name="Salem", state_id=state.id)
+        with open("file.json", "w") as f:
+            json.dump({"City." + city.id: city.to_dict()}, f)
+        with mock.patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            storage = FileStorage()
+        storage.reload()
+        self.assertNotIn("City." + city.id, storage._FileStorage__objects)
+        cities = storage.children(City, "state_id", state.id)
+        self.assertEqual([c.to_dict() for c in cities], [city.to_dict()])
+        with open("file.json", "w") as f:
+            json.dump({}, f)
+        storage.reload()
+        self.assertEqual(storage.children(City, "state_id", state.id), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_delete_cascade(self):
+        """Test that delete also deletes the objects depending on the
+        deleted one, down to the reviews of the places of a state"""
+        storage = FileStorage()
+        ohio = State(name="Ohio")
+        utah = State(name="Utah")
+        akron = City(name="Akron", state_id=ohio.id)
+        provo = City(name="Provo", state_id=utah.id)
+        owner = User(email="owner@mail.com", password="pwd")
+        guest = User(email="guest@mail.com", password="pwd")
+        chalet = Place(name="Chalet", city_id=akron.id, user_id=owner.id)
+        cabin = Place(name="Cabin", city_id=provo.id, user_id=guest.id)
+        nice = Review(text="Nice", place_id=chalet.id, user_id=guest.id)
+        cosy = Review(text="Cosy", place_id=cabin.id, user_id=owner.id)
+        objs = [ohio, utah, akron, provo, owner, guest, chalet, cabin, nice,
+                cosy]
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+        storage.delete(ohio)
+        kept = [obj for obj in objs
+                if obj not in [ohio, akron, chalet, nice]]
+        self.assertEqual(
+            [storage.get(type(obj), obj.id) for obj in objs],
+            [obj if obj in kept else None for obj in objs])
+        storage.delete(owner)
+        self.assertEqual(guest.places, [cabin])
+        self.assertEqual(guest.reviews, [])
+        self.assertEqual(cabin.reviews, [])
+        storage.save()
+        with mock.patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            lazy = FileStorage()
+        lazy.reload()
+
+        def stored():
+            """returns the objects of objs still in storage"""
+            return [obj for obj in objs
+                    if lazy.get(type(obj), obj.id) is not None]
+
+        self.assertEqual(stored(), [utah, provo, guest, cabin])
+        lazy.delete(utah)
+        lazy.save()
+        lazy.reload()
+        self.assertEqual(stored(), [guest])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_shards(self):
+        """Test that each class is saved to its own file in shard mode"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir}):
+                storage = FileStorage()
+            state = State(name="Montana")
+            city = City(name="Helena", state_id=state.id)
+            storage.new(state)
+            storage.new(city)
+            storage.save()
+            state_path = os.path.join(shard_dir, "State.json")
+            city_path = os.path.join(shard_dir, "City.json")
+            with open(state_path, "r") as f:
+                self.assertEqual(json.load(f)["State." + state.id],
+                                 state.to_dict())
+            with open(city_path, "r") as f:
+                self.assertIn("City." + city.id, json.load(f))
+            city_stat = os.stat(city_path)
+            state.name = "Wyoming"
+            storage.save()
+            self.assertEqual(os.stat(city_path), city_stat)
+            with open(state_path, "r") as f:
+                self.assertEqual(
+                    json.load(f)["State." + state.id]["name"], "Wyoming")
+            amenity = Amenity(name="Sauna")
+            with open(os.path.join(shard_dir, "Amenity.json"), "w") as f:
+                json.dump({"Amenity." + amenity.id: amenity.to_dict()}, f)
+            storage.reload()
+            self.assertEqual(storage.get(Amenity, amenity.id).name, "Sauna")
+            for obj in [state, city, storage.get(Amenity, amenity.id)]:
+                storage.delete(obj)
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_keeps_password(self):
+        """Test that reloading a changed file neither rebuilds unchanged
+        users nor hashes their stored password again"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir}):
+                storage = FileStorage()
+            user = User(email="a@b.c", password="secret")
+            storage.new(user)
+            storage.save()
+            path = os.path.join(shard_dir, "User.json")
+            with open(path, "r") as f:
+                saved = json.load(f)
+            other = User(email="d@e.f", password="pwd")
+            saved["User." + other.id] = other.to_dict()
+            with open(path, "w") as f:
+                json.dump(saved, f)
+            storage.reload()
+            self.assertIs(storage.get(User, user.id), user)
+            rebuilt = storage.get(User, other.id)
+            self.assertEqual(rebuilt.password, other.password)
+            rebuilt.first_name = "Dee"
+            storage.save()
+            with open(path, "r") as f:
+                saved = json.load(f)
+            digest = hashlib.md5(b"secret").hexdigest()
+            self.assertEqual(saved["User." + user.id]["password"], digest)
+            self.assertEqual(saved["User." + other.id]["password"],
+                             other.password)
+            for obj in [user, rebuilt]:
+                storage.delete(obj)
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_broken_shard(self):
+        """Test that a shard that cannot be read keeps neither the other
+        shards from loading nor its objects from being kept, and is not
+        written until it loads"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            objs = [State(name="Ohio"), Amenity(name="Wifi"),
+                    User(email="a@b.c", password="pwd")]
+            texts = {}
+            for obj in objs:
+                name = type(obj).__name__
+                texts[name] = json.dumps(
+                    {name + "." + obj.id: obj.to_dict()})
+                with open(os.path.join(shard_dir, name + ".json"), "w") as f:
+                    f.write(texts[name])
+            amenity_path = os.path.join(shard_dir, "Amenity.json")
+            with open(amenity_path, "w") as f:
+                f.write(texts["Amenity"][:20])
+            code = ("import json\n"
+                    "import sys\n"
+                    "from models import storage\n"
+                    "from models.amenity import Amenity\n"
+                    "from models.state import State\n"
+                    "counts = [storage.count_all()]\n"
+                    "State(name='Utah').save()\n"
+                    "Amenity(name='Sauna').save()\n"
+                    "with open(sys.argv[1], 'w') as f:\n"
+                    "    f.write(sys.argv[2])\n"
+                    "storage.reload()\n"
+                    "counts.append(storage.count_all())\n"
+                    "storage.save()\n"
+                    "print(json.dumps(counts))\n")
+            env = dict(os.environ, HBNB_FILE_SHARDS=shard_dir)
+            result = subprocess.run(
+                [sys.executable, "-c", code, amenity_path,
+                 texts["Amenity"]], env=env,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+                timeout=30)
+            before, after = json.loads(result.stdout.decode())
+            self.assertIn("could not load " + amenity_path,
+                          result.stderr.decode())
+            self.assertEqual([before["State"], before["Amenity"],
+                              before["User"]], [1, 0, 1])
+            self.assertEqual([after["State"], after["Amenity"],
+                              after["User"]], [2, 2, 1])
+            with open(os.path.join(shard_dir, "State.json"), "r") as f:
+                self.assertIn("State." + objs[0].id, json.load(f))
+            with open(amenity_path, "r") as f:
+                names = [record["name"] for record in json.load(f).values()]
+            self.assertEqual(sorted(names), ["Sauna", "Wifi"])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_binary(self):
+        """Test that objects are saved to and reloaded from .hbnb files in
+        binary format"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir,
+                                              "HBNB_FILE_FORMAT": "binary"}):
+                storage = FileStorage()
+            state = State(name="Idaho")
+            storage.new(state)
+            storage.save()
+            state_path = os.path.join(shard_dir, "State.hbnb")
+            self.assertFalse(os.path.exists(
+                os.path.join(shard_dir, "State.json")))
+            records = dict(BinarySerializer().iter_records(state_path))
+            self.assertEqual(records["State." + state.id], state.to_dict())
+            amenity = Amenity(name="Hammock")
+            serializer = BinarySerializer()
+            serializer.write(
+                os.path.join(shard_dir, "Amenity.hbnb"),
+                [("Amenity." + amenity.id,
+                  serializer.dumps(amenity.to_dict()))])
+            storage.reload()
+            self.assertEqual(storage.get(Amenity, amenity.id).to_dict(),
+                             amenity.to_dict())
+            for obj in [state, storage.get(Amenity, amenity.id)]:
+                storage.delete(obj)
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected with the known ones"""
+        with mock.patch.dict(os.environ, {"HBNB_FILE_FORMAT": "xml"}):
+            with self.assertRaisesRegex(ValueError, "json, binary"):
+                FileStorage()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_shared(self):
+        """Test that processes sharing the files see each other's saves
+        and do not lose their own unsaved changes"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir,
+                                              "HBNB_FILE_SHARED": "1"}):
+                storage = FileStorage()
+            state = State(name="Kansas")
+            storage.new(state)
+            storage.save()
+            city = City(name="Wichita", state_id=state.id)
+
+            def write():
+                """saves city from another process"""
+                storage.new(city)
+                storage.save()
+
+            process = multiprocessing.get_context("fork").Process(
+                target=write)
+            process.start()
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+            state.name = "Sunflower"
+            self.assertIsNone(storage._FileStorage__objects.get(
+                "City." + city.id))
+            self.assertEqual(storage.get(City, city.id).name, "Wichita")
+            self.assertEqual(state.name, "Sunflower")
+            storage.save()
+            with open(os.path.join(shard_dir, "State.json"), "r") as f:
+                self.assertEqual(
+                    json.load(f)["State." + state.id]["name"], "Sunflower")
+            with open(os.path.join(shard_dir, "City.json"), "r") as f:
+                self.assertIn("City." + city.id, json.load(f))
+            for obj in [state, storage.get(City, city.id)]:
+                storage.delete(obj)
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_shared_password(self):
+        """Test that processes taking turns saving users keep the stored
+        password of the others as it is"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir,
+                                              "HBNB_FILE_SHARED": "1"}):
+                storage = FileStorage()
+            user = User(email="a@b.c", password="secret")
+            storage.new(user)
+            storage.save()
+            path = os.path.join(shard_dir, "User.json")
+            env = dict(os.environ, HBNB_FILE_SHARDS=shard_dir,
+                       HBNB_FILE_SHARED="1")
+            code = ("from models.user import User\n"
+                    "other = User(email='b@c.d', password='pwd')\n"
+                    "other.save()\n"
+                    "print(other.id)\n")
+            digest = hashlib.md5(b"secret").hexdigest()
+            ids = [user.id]
+            for i in range(3):
+                result = subprocess.run([sys.executable, "-c", code],
+                                        env=env, stdout=subprocess.PIPE,
+                                        check=True, timeout=30)
+                ids.append(result.stdout.decode().strip())
+                self.assertIs(storage.get(User, user.id), user)
+                other = User(email="e@f.g", password="pwd")
+                storage.new(other)
+                storage.save()
+                ids.append(other.id)
+                with open(path, "r") as f:
+                    saved = json.load(f)
+                for id in ids:
+                    self.assertIn("User." + id, saved)
+                self.assertEqual(saved["User." + user.id]["password"],
+                                 digest)
+            for id in ids:
+                storage.delete(storage.get(User, id))
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_keeps_unsaved(self):
+        """Test that closing after another process saved keeps the changes
+        still waiting to be written"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            env = {"HBNB_FILE_SHARDS": shard_dir, "HBNB_FILE_SHARED": "1",
+                   "HBNB_FILE_FLUSH_WINDOW": "30"}
+            with mock.patch.dict(os.environ, env):
+                storage = FileStorage()
+            state = State(name="Oregon")
+            path = os.path.join(shard_dir, "State.json")
+            with open(path, "w") as f:
+                json.dump({"State." + state.id: state.to_dict()}, f)
+            storage.reload()
+            code = ("from models.state import State\n"
+                    "other = State(name='Idaho')\n"
+                    "other.save()\n"
+                    "print(other.id)\n")
+            try:
+                state = storage.get(State, state.id)
+                state.name = "Beaver"
+                storage.save(wait=False)
+                result = subprocess.run(
+                    [sys.executable, "-c", code],
+                    env=dict(os.environ, HBNB_FILE_SHARDS=shard_dir,
+                             HBNB_FILE_SHARED="1"),
+                    stdout=subprocess.PIPE, check=True, timeout=30)
+                other_id = result.stdout.decode().strip()
+                storage.close()
+                self.assertEqual(storage.get(State, state.id).name, "Beaver")
+                self.assertEqual(storage.get(State, other_id).name, "Idaho")
+            finally:
+                storage._FileStorage__stop_flusher()
+            with open(path, "r") as f:
+                self.assertEqual(json.load(f)["State." + state.id]["name"],
+                                 "Beaver")
+            for obj in [state, storage.get(State, other_id)]:
+                storage.delete(obj)
+            storage.save(wait=False)
+            storage._FileStorage__stop_flusher()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "no /proc/self/fd")
+    def test_shared_lock_file(self):
+        """Test that the instances sharing files open their lock file once"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            env = {"HBNB_FILE_SHARDS": shard_dir, "HBNB_FILE_SHARED": "1"}
+            with mock.patch.dict(os.environ, env):
+                storages = [FileStorage()]
+                opened = len(os.listdir("/proc/self/fd"))
+                storages += [FileStorage() for _ in range(10)]
+            self.assertEqual(len(os.listdir("/proc/self/fd")), opened)
+            self.assertEqual(len({storage._FileStorage__lock_fd
+                                  for storage in storages}), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_group_commit(self):
+        """Test that the flusher writes saves together, and that waiting
+        saves return once written"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            env = {"HBNB_FILE_SHARDS": shard_dir,
+                   "HBNB_FILE_FLUSH_WINDOW": "60",
+                   "HBNB_FILE_FLUSH_COUNT": "2"}
+            with mock.patch.dict(os.environ, env):
+                storage = FileStorage()
+            path = os.path.join(shard_dir, "State.json")
+            try:
+                first = State(name="Maine")
+                storage.new(first)
+                storage.save(wait=False)
+                self.assertFalse(os.path.exists(path))
+                second = State(name="Vermont")
+                storage.new(second)
+                storage.save()
+                with open(path, "r") as f:
+                    saved = json.load(f)
+                self.assertIn("State." + first.id, saved)
+                self.assertIn("State." + second.id, saved)
+                for obj in [first, second]:
+                    storage.delete(obj)
+                storage.save(wait=False)
+            finally:
+                storage._FileStorage__stop_flusher()
+            with open(path, "r") as f:
+                saved = json.load(f)
+            self.assertNotIn("State." + first.id, saved)
+            self.assertNotIn("State." + second.id, saved)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_group_commit_errors(self):
+        """Test that each waiting save gets the error of its own write,
+        and that only a forked process replaces the locks"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            env = {"HBNB_FILE_SHARDS": shard_dir,
+                   "HBNB_FILE_FLUSH_WINDOW": "60",
+                   "HBNB_FILE_FLUSH_COUNT": "1"}
+            with mock.patch.dict(os.environ, env):
+                storage = FileStorage()
+            save_lock = FileStorage._FileStorage__save_lock
+            flush = mock.Mock(side_effect=[OSError("disk full"), None, None])
+            with mock.patch.object(storage, "_FileStorage__flush", flush):
+                try:
+                    with self.assertRaises(OSError):
+                        storage.save()
+                    storage.save()
+                    storage.save(wait=False)
+                finally:
+                    storage._FileStorage__stop_flusher()
+            self.assertEqual(flush.call_count, 3)
+            self.assertIs(FileStorage._FileStorage__save_lock, save_lock)
+            self.assertEqual(FileStorage._FileStorage__flush_errors, {})
+
+            def check():
+                """exits with whether the locks were replaced"""
+                sys.exit(FileStorage._FileStorage__save_lock is save_lock)
+
+            process = multiprocessing.get_context("fork").Process(
+                target=check)
+            process.start()
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_group_commit_exit(self):
+        """Test that saves still waiting for the flusher are written when
+        the process exits"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            env = dict(os.environ, HBNB_FILE_SHARDS=shard_dir,
+                       HBNB_FILE_FLUSH_WINDOW="60")
+            code = ("from models.state import State\n"
+                    "from models import storage\n"
+                    "state = State(name='Texas')\n"
+                    "storage.new(state)\n"
+                    "storage.save(wait=False)\n"
+                    "print(state.id)\n")
+            result = subprocess.run([sys.executable, "-c", code], env=env,
+                                    stdout=subprocess.PIPE, check=True,
+                                    timeout=30)
+            state_id = result.stdout.decode().strip()
+            with open(os.path.join(shard_dir, "State.json"), "r") as f:
+                self.assertEqual(json.load(f)["State." + state_id]["name"],
+                                 "Texas")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_threads(self):
+        """Test that threads may read, create and save objects at once"""
+        with tempfile.TemporaryDirectory() as shard_dir:
+            with mock.patch.dict(os.environ, {"HBNB_FILE_SHARDS": shard_dir}):
+                storage = FileStorage()
+            created = []
+            errors = []
+
+            def write():
+                """creates and saves states"""
+                try:
+                    for i in range(50):
+                        state = State(name="State {}".format(i))
+                        storage.new(state)
+                        created.append(state)
+                        storage.save()
+                except Exception as e:
+                    errors.append(e)
+
+            def read():
+                """reads states while they are created"""
+                try:
+                    for i in range(200):
+                        states = storage.all(State)
+                        self.assertLessEqual(len(states),
+                                             storage.count(State))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=write) for _ in range(4)]
+            threads += [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            with open(os.path.join(shard_dir, "State.json"), "r") as f:
+                saved = json.load(f)
+            for state in created:
+                self.assertIn("State." + state.id, saved)
+                storage.delete(state)
+            storage.save()
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Contains the TestJournalDocs and TestJournal classes
+"""
+
+import inspect
+from models.engine import journal
+import os
+import pep8
+import tempfile
+import unittest
+Journal = journal.Journal
+
+
+class TestJournalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of Journal class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.journal_f = inspect.getmembers(Journal, inspect.isfunction)
+
+    def test_pep8_conformance_journal(self):
+        """Test that models/engine/journal.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/journal.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_journal(self):
+        """Test tests/test_models/test_engine/test_journal.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_journal.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_journal_module_docstring(self):
+        """Test for the journal.py module docstring"""
+        self.assertIsNot(journal.__doc__, None,
+                         "journal.py needs a docstring")
+        self.assertTrue(len(journal.__doc__) >= 1,
+                        "journal.py needs a docstring")
+
+    def test_journal_class_docstring(self):
+        """Test for the Journal class docstring"""
+        self.assertIsNot(Journal.__doc__, None,
+                         "Journal class needs a docstring")
+        self.assertTrue(len(Journal.__doc__) >= 1,
+                        "Journal class needs a docstring")
+
+    def test_journal_func_docstrings(self):
+        """Test for the presence of docstrings in Journal methods"""
+        for func in self.journal_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestJournal(unittest.TestCase):
+    """Test the Journal class"""
+    def setUp(self):
+        """Creates a journal in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal = Journal(os.path.join(self.tmp.name, "file.journal"))
+
+    def tearDown(self):
+        """Removes the temporary directory"""
+        self.tmp.cleanup()
+
+    def test_append_and_read(self):
+        """Test that appended entries are read back in order"""
+        self.assertEqual(self.journal.read(), ([], 0))
+        self.journal.append([("State.1", '{"name": "Ohio"}'),
+                             ("State.2", None)])
+        entries, offset = self.journal.read()
+        self.assertEqual(entries, [("State.1", {"name": "Ohio"}),
+                                   ("State.2", None)])
+        self.assertEqual(offset, self.journal.size())
+        self.journal.append([("State.3", '{}')])
+        self.assertEqual(self.journal.read(offset),
+                         ([("State.3", {})], self.journal.size()))
+
+    def test_interrupted_append(self):
+        """Test that a partial line is skipped and does not swallow the
+        entries appended after it"""
+        self.journal.append([("State.1", '{}')])
+        with open(self.journal.path, "a") as f:
+            f.write('["State.2", {"na')
+        entries, offset = self.journal.read()
+        self.assertEqual(entries, [("State.1", {})])
+        self.assertLess(offset, self.journal.size())
+        self.journal.append([("State.3", '{}')])
+        entries, offset = self.journal.read()
+        self.assertEqual(entries, [("State.1", {}), ("State.3", {})])
+        self.assertEqual(offset, self.journal.size())
+
+    def test_clear(self):
+        """Test that clear removes every entry"""
+        self.journal.append([("State.1", '{}')])
+        self.assertIsNotNone(self.journal.stamp())
+        self.journal.clear()
+        self.assertIsNone(self.journal.stamp())
+        self.assertEqual(self.journal.size(), 0)
+        self.assertEqual(self.journal.read(), ([], 0))
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Contains the TestPoolDocs and TestPool classes
+"""
+
+import inspect
+from models.engine import pool
+import pep8
+import sqlite3
+import threading
+import unittest
+TimedPool = pool.TimedPool
+
+
+def creator():
+    """opens a new connection to an in-memory database"""
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+class TestPoolDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the pool classes"""
+    def test_pep8_conformance_pool(self):
+        """Test that models/engine/pool.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pool(self):
+        """Test tests/test_models/test_engine/test_pool.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pool_module_docstring(self):
+        """Test for the pool.py module docstring"""
+        self.assertIsNot(pool.__doc__, None,
+                         "pool.py needs a docstring")
+        self.assertTrue(len(pool.__doc__) >= 1,
+                        "pool.py needs a docstring")
+
+    def test_pool_class_docstrings(self):
+        """Test for the pool classes docstrings"""
+        for cls in [TimedPool] + list(pool.pools.values()):
+            self.assertIsNot(cls.__doc__, None,
+                             "{} class needs a docstring".format(cls))
+
+    def test_pool_func_docstrings(self):
+        """Test for the presence of docstrings in the pool methods"""
+        for cls in [TimedPool] + list(pool.pools.values()):
+            for name, func in vars(cls).items():
+                if inspect.isfunction(func):
+                    self.assertIsNot(func.__doc__, None,
+                                     "{:s} method needs a docstring"
+                                     .format(name))
+
+
+class TestPool(unittest.TestCase):
+    """Test the pool classes"""
+    def test_queue_stats(self):
+        """Test the statistics of a queue pool while connections are used"""
+        queue = pool.TimedQueuePool(creator, pool_size=1, max_overflow=1)
+        first = queue.connect()
+        second = queue.connect()
+        stats = queue.stats()
+        self.assertEqual(stats["pool"], "TimedQueuePool")
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["checked_out"], 2)
+        self.assertEqual(stats["overflow"], 1)
+        self.assertEqual(stats["size"], 1)
+        self.assertGreater(stats["wait_seconds"], 0)
+        self.assertLessEqual(stats["max_wait_seconds"],
+                             stats["wait_seconds"])
+        first.close()
+        second.close()
+        stats = queue.stats()
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checked_in"], 1)
+
+    def test_queue_wait(self):
+        """Test that the time waiting for a free connection is counted"""
+        queue = pool.TimedQueuePool(creator, pool_size=1, max_overflow=0)
+        conn = queue.connect()
+        timer = threading.Timer(0.2, conn.close)
+        timer.start()
+        queue.connect().close()
+        timer.join()
+        self.assertGreaterEqual(queue.stats()["max_wait_seconds"], 0.15)
+
+    def test_null_stats(self):
+        """Test the statistics of a pool opening a connection for each use"""
+        null = pool.TimedNullPool(creator)
+        for i in range(3):
+            null.connect().close()
+        stats = null.stats()
+        self.assertEqual(stats["pool"], "TimedNullPool")
+        self.assertEqual(stats["checkouts"], 3)
+
+    def test_recreate(self):
+        """Test that a recreated pool keeps statistics"""
+        for cls in pool.pools.values():
+            with self.subTest(cls=cls):
+                new = cls(creator).recreate()
+                self.assertIs(type(new), cls)
+                new.connect().close()
+                self.assertEqual(new.stats()["checkouts"], 1)
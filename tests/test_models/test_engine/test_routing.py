@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the TestRoutingSessionDocs and TestRoutingSession classes
+"""
+
+import inspect
+from models.engine import routing
+import os
+import pep8
+from sqlalchemy import Column, MetaData, String, Table, create_engine
+from sqlalchemy import insert, select
+import tempfile
+import unittest
+RoutingSession = routing.RoutingSession
+
+
+class TestRoutingSessionDocs(unittest.TestCase):
+    """Tests to check the documentation and style of RoutingSession class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.routing_f = [func for func in vars(RoutingSession).values()
+                         if inspect.isfunction(func)]
+
+    def test_pep8_conformance_routing(self):
+        """Test that models/engine/routing.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/routing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_routing(self):
+        """Test tests/test_models/test_engine/test_routing.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_routing.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_routing_module_docstring(self):
+        """Test for the routing.py module docstring"""
+        self.assertIsNot(routing.__doc__, None,
+                         "routing.py needs a docstring")
+        self.assertTrue(len(routing.__doc__) >= 1,
+                        "routing.py needs a docstring")
+
+    def test_routing_class_docstring(self):
+        """Test for the RoutingSession class docstring"""
+        self.assertIsNot(RoutingSession.__doc__, None,
+                         "RoutingSession class needs a docstring")
+        self.assertTrue(len(RoutingSession.__doc__) >= 1,
+                        "RoutingSession class needs a docstring")
+
+    def test_routing_func_docstrings(self):
+        """Test for the presence of docstrings in RoutingSession methods"""
+        for func in self.routing_f:
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} method needs a docstring"
+                             .format(func.__name__))
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} method needs a docstring"
+                            .format(func.__name__))
+
+
+class TestRoutingSession(unittest.TestCase):
+    """Test the RoutingSession class on SQLite files standing in for a
+    primary database and its replica"""
+    def setUp(self):
+        """Creates a primary and a replica database, each holding a row
+        naming it"""
+        self.tmp = tempfile.TemporaryDirectory()
+        metadata = MetaData()
+        self.table = Table("names", metadata, Column("name", String(60)))
+        self.engines = {}
+        for name in ["primary", "replica"]:
+            engine = create_engine("sqlite:///" +
+                                   os.path.join(self.tmp.name, name))
+            metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(self.table).values(name=name))
+            self.engines[name] = engine
+
+    def tearDown(self):
+        """Removes the databases"""
+        for engine in self.engines.values():
+            engine.dispose()
+        self.tmp.cleanup()
+
+    def names(self, session):
+        """returns the names read by session"""
+        return session.scalars(select(self.table.c.name)).all()
+
+    def session(self):
+        """returns a RoutingSession of the primary and replica"""
+        return RoutingSession(bind=self.engines["primary"],
+                              replicas=[self.engines["replica"]])
+
+    def test_read_replica(self):
+        """Test that reads go to the replica"""
+        session = self.session()
+        self.assertEqual(self.names(session), ["replica"])
+        session.close()
+
+    def test_no_replica(self):
+        """Test that reads go to the primary without replicas"""
+        session = RoutingSession(bind=self.engines["primary"])
+        self.assertEqual(self.names(session), ["primary"])
+        session.close()
+
+    def test_write_primary(self):
+        """Test that writes go to the primary, and that reads follow them
+        until the session is closed"""
+        session = self.session()
+        session.execute(insert(self.table).values(name="written"))
+        self.assertEqual(self.names(session), ["primary", "written"])
+        session.commit()
+        self.assertEqual(self.names(session), ["primary", "written"])
+        session.close()
+        self.assertEqual(self.names(session), ["replica"])
+        session.close()
+
+    def test_stick(self):
+        """Test that stick sends reads to the primary"""
+        session = self.session()
+        self.assertEqual(self.names(session), ["replica"])
+        session.stick()
+        self.assertEqual(self.names(session), ["primary"])
+        session.close()
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""
+Contains the TestRWLockDocs and TestRWLock classes
+"""
+
+import inspect
+from models.engine import rwlock
+import pep8
+import threading
+import time
+import unittest
+RWLock = rwlock.RWLock
+
+
+class TestRWLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of RWLock class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.rwlock_f = inspect.getmembers(RWLock, inspect.isfunction)
+
+    def test_pep8_conformance_rwlock(self):
+        """Test that models/engine/rwlock.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_rwlock(self):
+        """Test tests/test_models/test_engine/test_rwlock.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_rwlock_module_docstring(self):
+        """Test for the rwlock.py module docstring"""
+        self.assertIsNot(rwlock.__doc__, None,
+                         "rwlock.py needs a docstring")
+        self.assertTrue(len(rwlock.__doc__) >= 1,
+                        "rwlock.py needs a docstring")
+
+    def test_rwlock_class_docstring(self):
+        """Test for the RWLock class docstring"""
+        self.assertIsNot(RWLock.__doc__, None,
+                         "RWLock class needs a docstring")
+        self.assertTrue(len(RWLock.__doc__) >= 1,
+                        "RWLock class needs a docstring")
+
+    def test_rwlock_func_docstrings(self):
+        """Test for the presence of docstrings in RWLock methods"""
+        for func in self.rwlock_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestRWLock(unittest.TestCase):
+    """Test the RWLock class"""
+    def test_write_version(self):
+        """Test that the version is odd while the lock is held"""
+        lock = RWLock()
+        self.assertEqual(lock.version, 0)
+        with lock.write():
+            self.assertEqual(lock.version, 1)
+            with lock.write():
+                self.assertEqual(lock.version, 1)
+            self.assertEqual(lock.version, 1)
+        self.assertEqual(lock.version, 2)
+
+    def test_read(self):
+        """Test that read returns the result of the function"""
+        lock = RWLock()
+        self.assertEqual(lock.read(max, 1, 3), 3)
+        with lock.write():
+            self.assertEqual(lock.read(max, 1, 3), 3)
+
+    def test_read_waits_for_writer(self):
+        """Test that a read during a write waits until it is done"""
+        lock = RWLock()
+        shared = {"a": 0, "b": 0}
+        seen = []
+        writing = threading.Event()
+
+        def reader():
+            """reads both values while the writer changes them"""
+            writing.wait()
+            seen.append(lock.read(lambda: (shared["a"], shared["b"])))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        with lock.write():
+            shared["a"] = 1
+            writing.set()
+            time.sleep(0.05)
+            shared["b"] = 1
+        thread.join(5)
+        self.assertEqual(seen, [(1, 1)])
+
+    def test_read_retries(self):
+        """Test that a read is run again when a write happened meanwhile"""
+        lock = RWLock()
+        calls = []
+
+        def function():
+            """writes during the first call only"""
+            calls.append(lock.version)
+            if len(calls) == 1:
+                with lock.write():
+                    pass
+            return len(calls)
+
+        self.assertEqual(lock.read(function), 2)
+        self.assertEqual(calls, [0, 2])
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs and TestSerializers classes
+"""
+
+import inspect
+from models.engine import serializers
+from models.place import Place
+from models.state import State
+import os
+import pep8
+import tempfile
+import unittest
+JSONSerializer = serializers.JSONSerializer
+BinarySerializer = serializers.BinarySerializer
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the serializers"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.serializer_f = (
+            inspect.getmembers(JSONSerializer, inspect.isfunction) +
+            inspect.getmembers(BinarySerializer, inspect.isfunction) +
+            inspect.getmembers(BinarySerializer, inspect.ismethod) +
+            inspect.getmembers(serializers, inspect.isfunction))
+
+    def test_pep8_conformance_serializers(self):
+        """Test that models/engine/serializers.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_serializers(self):
+        """Test tests/test_models/test_engine/test_serializers.py for PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_module_docstring(self):
+        """Test for the serializers.py module docstring"""
+        self.assertIsNot(serializers.__doc__, None,
+                         "serializers.py needs a docstring")
+        self.assertTrue(len(serializers.__doc__) >= 1,
+                        "serializers.py needs a docstring")
+
+    def test_serializers_class_docstrings(self):
+        """Test for the serializer class docstrings"""
+        for cls in [JSONSerializer, BinarySerializer]:
+            self.assertIsNot(cls.__doc__, None,
+                             "{} class needs a docstring".format(cls))
+            self.assertTrue(len(cls.__doc__) >= 1,
+                            "{} class needs a docstring".format(cls))
+
+    def test_serializers_func_docstrings(self):
+        """Test for the presence of docstrings in serializer methods"""
+        for func in self.serializer_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the JSONSerializer and BinarySerializer classes"""
+    def setUp(self):
+        """Creates records and a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        state = State(name="Nevada")
+        place = Place(name="Loft", number_rooms=2, latitude=36.1,
+                      amenity_ids=["a", "b"], description=None)
+        self.records = {"State." + state.id: state.to_dict(),
+                        "Place." + place.id: place.to_dict()}
+
+    def tearDown(self):
+        """Removes the temporary directory"""
+        self.tmp.cleanup()
+
+    def path(self, name):
+        """returns the path of a file in the temporary directory"""
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip(self):
+        """Test that each format reads back the records it wrote"""
+        for serializer in [JSONSerializer(), BinarySerializer()]:
+            with self.subTest(serializer=serializer.name):
+                path = self.path("file" + serializer.extension)
+                serializer.write(path, [(key, serializer.dumps(record))
+                                        for key, record
+                                        in self.records.items()])
+                self.assertEqual(dict(serializer.iter_records(path)),
+                                 self.records)
+
+    def test_read_by_chunks(self):
+        """Test that records spanning several chunks are read whole"""
+        for serializer in [JSONSerializer(), BinarySerializer()]:
+            with self.subTest(serializer=serializer.name):
+                path = self.path("file" + serializer.extension)
+                serializer.write(path, [(key, serializer.dumps(record))
+                                        for key, record
+                                        in self.records.items()])
+                self.assertEqual(
+                    dict(serializer.iter_records(path, chunk_size=7)),
+                    self.records)
+
+    def test_empty_file(self):
+        """Test that a file without records yields nothing"""
+        for serializer in [JSONSerializer(), BinarySerializer()]:
+            with self.subTest(serializer=serializer.name):
+                path = self.path("file" + serializer.extension)
+                serializer.write(path, [])
+                self.assertEqual(list(serializer.iter_records(path)), [])
+
+    def test_binary_is_smaller(self):
+        """Test that the binary format takes less space than JSON"""
+        sizes = []
+        for serializer in [JSONSerializer(), BinarySerializer()]:
+            path = self.path("file" + serializer.extension)
+            serializer.write(path, [(key, serializer.dumps(record))
+                                    for key, record in self.records.items()])
+            sizes.append(os.path.getsize(path))
+        self.assertLess(sizes[1], sizes[0])
+
+    def test_binary_errors(self):
+        """Test that foreign and truncated binary files are rejected"""
+        path = self.path("file.hbnb")
+        with open(path, "wb") as f:
+            f.write(b"{}")
+        with self.assertRaises(ValueError):
+            list(BinarySerializer().iter_records(path))
+        serializer = BinarySerializer()
+        serializer.write(path, [(key, serializer.dumps(record))
+                                for key, record in self.records.items()])
+        with open(path, "rb+") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        with self.assertRaises(ValueError):
+            list(serializer.iter_records(path))
+
+    def test_binary_marshal_version(self):
+        """Test that binary files of an older marshal version are read,
+        and those of a newer one rejected"""
+        path = self.path("file.hbnb")
+        serializer = BinarySerializer()
+        serializer.write(path, [(key, serializer.dumps(record))
+                                for key, record in self.records.items()])
+        for version in [serializer.header[-1] - 1,
+                        serializer.header[-1] + 1]:
+            with open(path, "rb+") as f:
+                f.seek(len(serializer.header) - 1)
+                f.write(bytes([version]))
+            if version < serializer.header[-1]:
+                self.assertEqual(dict(serializer.iter_records(path)),
+                                 self.records)
+            else:
+                with self.assertRaises(ValueError):
+                    list(serializer.iter_records(path))
+
+    def test_convert(self):
+        """Test that convert writes the records in the other format"""
+        serializer = JSONSerializer()
+        serializer.write(self.path("file.json"),
+                         [(key, serializer.dumps(record))
+                          for key, record in self.records.items()])
+        count = serializers.convert(self.path("file.json"),
+                                    self.path("file.hbnb"))
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            dict(BinarySerializer().iter_records(self.path("file.hbnb"))),
+            self.records)
+        serializers.convert(self.path("file.hbnb"), self.path("back.json"))
+        self.assertEqual(
+            dict(serializer.iter_records(self.path("back.json"))),
+            self.records)
+        with self.assertRaises(ValueError):
+            serializers.convert(self.path("file.json"), self.path("file.txt"))
@@ -0,0 +1,718 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pep8
+import sqlite3
+from models.engine import sqlite_storage
+import subprocess
+import sys
+import tempfile
+import unittest
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+def run(code, path, **environ):
+    """runs code in a new process using a SQLiteStorage on the database
+    at path, with the given environment variables, and returns the JSON
+    value printed on its last line"""
+    env = dict(os.environ)
+    env.pop("HBNB_ENV", None)
+    env.pop("HBNB_DB_CACHE_SIZE", None)
+    env.pop("HBNB_DB_OBJECT_CACHE_SIZE", None)
+    env.update(HBNB_TYPE_STORAGE="sqlite", HBNB_SQLITE_DB=path, **environ)
+    result = subprocess.run([sys.executable, "-c", code], env=env,
+                            stdout=subprocess.PIPE, check=True, timeout=30)
+    return json.loads(result.stdout.decode().splitlines()[-1])
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqlite_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_engine/test_sqlite_storage.py for
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqlite_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqlite_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    def test_selected(self):
+        """Test that HBNB_TYPE_STORAGE=sqlite selects SQLiteStorage and maps
+        the models to tables"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json, models\n"
+                    "print(json.dumps([type(models.storage).__name__,\n"
+                    "                  models.storage_t]))\n")
+            self.assertEqual(run(code, os.path.join(tmp, "hbnb.db")),
+                             ["SQLiteStorage", "db"])
+
+    def test_pragmas(self):
+        """Test that connections use write-ahead logging and foreign keys"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "engine = storage._DBStorage__engine\n"
+                    "with engine.connect() as c:\n"
+                    "    print(json.dumps([\n"
+                    "        c.exec_driver_sql('PRAGMA ' + p).scalar()\n"
+                    "        for p in ['journal_mode', 'foreign_keys']]))\n")
+            self.assertEqual(run(code, os.path.join(tmp, "hbnb.db")),
+                             ["wal", 1])
+
+    def test_save_reload(self):
+        """Test that saved objects are found by another process"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hbnb.db")
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "from models.city import City\n"
+                    "from models.state import State\n"
+                    "state = State(name='California')\n"
+                    "state.save()\n"
+                    "City(name='Fremont', state_id=state.id).save()\n"
+                    "print(json.dumps(state.id))\n")
+            state_id = run(code, path)
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "state = storage.get(State, {!r})\n"
+                    "print(json.dumps([state.name, storage.count(),\n"
+                    "                  [c.name for c in state.cities]]))\n"
+                    .format(state_id))
+            self.assertEqual(run(code, path),
+                             ["California", 2, ["Fremont"]])
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "storage.delete(storage.get(State, {!r}))\n"
+                    "storage.save()\n"
+                    "print(json.dumps(storage.count()))\n"
+                    .format(state_id))
+            self.assertEqual(run(code, path), 0)
+
+    def test_count_all(self):
+        """Test that count_all counts every class with a single query"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from sqlalchemy import event\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "State(name='Ohio').save()\n"
+                    "State(name='Utah').save()\n"
+                    "queries = []\n"
+                    "event.listen(storage._DBStorage__engine,\n"
+                    "             'before_cursor_execute',\n"
+                    "             lambda *args: queries.append(args[2]))\n"
+                    "counts = storage.count_all()\n"
+                    "print(json.dumps([counts, len(queries),\n"
+                    "                  storage.count(State)]))\n")
+            counts, queries, states = run(code, os.path.join(tmp, "hbnb.db"))
+            self.assertEqual(counts, {"Amenity": 0, "City": 0, "Place": 0,
+                                      "Review": 0, "State": 2, "User": 0})
+            self.assertEqual(queries, 1)
+            self.assertEqual(states, 2)
+
+    def test_pool_options(self):
+        """Test that the connection pool is configured from the
+        environment"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hbnb.db")
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "pool = storage._DBStorage__engine.pool\n"
+                    "storage.count()\n"
+                    "print(json.dumps([storage.pool_stats(),\n"
+                    "                  pool._timeout, pool._recycle,\n"
+                    "                  pool._pre_ping]))\n")
+            stats, timeout, recycle, pre_ping = run(
+                code, path, HBNB_DB_POOL_SIZE="3",
+                HBNB_DB_POOL_MAX_OVERFLOW="0", HBNB_DB_POOL_TIMEOUT="2.5",
+                HBNB_DB_POOL_RECYCLE="600", HBNB_DB_POOL_PRE_PING="1")
+            self.assertEqual(stats["pool"], "TimedQueuePool")
+            self.assertEqual(stats["size"], 3)
+            self.assertGreaterEqual(stats["checkouts"], 1)
+            self.assertEqual([timeout, recycle, pre_ping], [2.5, 600, True])
+            stats = run("import json\n"
+                        "from models import storage\n"
+                        "print(json.dumps(storage.pool_stats()))\n",
+                        path, HBNB_DB_POOL="null")
+            self.assertEqual(stats["pool"], "TimedNullPool")
+
+    def test_search_places(self):
+        """Test that search_places filters by states, cities and amenities
+        like the places_search route did in Python"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "from models.amenity import Amenity\n"
+                    "from models.city import City\n"
+                    "from models.place import Place\n"
+                    "from models.state import State\n"
+                    "from models.user import User\n"
+                    "ca, nv, tx = [State(name=n) for n in ['CA', 'NV',\n"
+                    "                                    'TX']]\n"
+                    "sf = City(name='SF', state_id=ca.id)\n"
+                    "la = City(name='LA', state_id=ca.id)\n"
+                    "lv = City(name='LV', state_id=nv.id)\n"
+                    "wifi, tv = Amenity(name='Wifi'), Amenity(name='TV')\n"
+                    "user = User(email='a@b.c', password='pwd')\n"
+                    "places = {}\n"
+                    "for name, city, amenities in [\n"
+                    "        ('loft', sf, [wifi, tv]), ('hut', sf, []),\n"
+                    "        ('villa', la, [wifi]), ('motel', lv, [tv])]:\n"
+                    "    places[name] = Place(name=name, city_id=city.id,\n"
+                    "                         user_id=user.id)\n"
+                    "    places[name].amenities.extend(amenities)\n"
+                    "for obj in [ca, nv, tx, sf, la, lv, wifi, tv, user]:\n"
+                    "    storage.new(obj)\n"
+                    "for obj in places.values():\n"
+                    "    storage.new(obj)\n"
+                    "storage.save()\n"
+                    "storage.close()\n"
+                    "results = []\n"
+                    "for states, cities, amenities in [\n"
+                    "        (None, None, None), ([ca.id], None, None),\n"
+                    "        ([nv.id], [sf.id], None), ([], [], []),\n"
+                    "        ([tx.id], None, None), (None, ['nope'], None),\n"
+                    "        ([ca.id], None, [wifi.id]),\n"
+                    "        (None, None, [wifi.id, tv.id, wifi.id]),\n"
+                    "        (None, None, [wifi.id, 'nope'])]:\n"
+                    "    results.append(sorted(\n"
+                    "        place.name for place in\n"
+                    "        storage.search_places(states, cities,\n"
+                    "                              amenities)))\n"
+                    "print(json.dumps(results))\n")
+            everything = ["hut", "loft", "motel", "villa"]
+            self.assertEqual(run(code, os.path.join(tmp, "hbnb.db")), [
+                everything, ["hut", "loft", "villa"],
+                ["hut", "loft", "motel"], everything,
+                everything, [], ["loft", "villa"], ["loft"], []])
+
+    def test_options(self):
+        """Test that loading options load the related objects with a
+        number of queries independent of the number of objects"""
+        code = ("import json, sys\n"
+                "from sqlalchemy import event\n"
+                "from models import storage\n"
+                "from models.city import City\n"
+                "from models.place import Place\n"
+                "from models.state import State\n"
+                "from models.user import User\n"
+                "n = int(sys.argv[1])\n"
+                "user = User(email='a@b.c', password='pwd')\n"
+                "storage.new(user)\n"
+                "for i in range(n):\n"
+                "    state = State(name=str(i))\n"
+                "    city = City(name=str(i), state_id=state.id)\n"
+                "    place = Place(name=str(i), city_id=city.id,\n"
+                "                  user_id=user.id)\n"
+                "    for obj in [state, city, place]:\n"
+                "        storage.new(obj)\n"
+                "storage.save()\n"
+                "storage.close()\n"
+                "queries = []\n"
+                "event.listen(storage._DBStorage__engine,\n"
+                "             'before_cursor_execute',\n"
+                "             lambda *args: queries.append(args[2]))\n"
+                "counts = []\n"
+                "for options in [None, {'cities': 'selectin'},\n"
+                "                {'cities': 'joined'},\n"
+                "                {'cities': 'selectin',\n"
+                "                 'cities.places': 'selectin'}]:\n"
+                "    del queries[:]\n"
+                "    states = storage.all(State, options=options)\n"
+                "    cities = [city.to_dict() for state in states.values()\n"
+                "              for city in state.cities]\n"
+                "    if options and 'cities.places' in options:\n"
+                "        places = [place.to_dict() for state in\n"
+                "                  states.values() for city in state.cities\n"
+                "                  for place in city.places]\n"
+                "    counts.append(len(queries))\n"
+                "    storage.close()\n"
+                "del queries[:]\n"
+                "state = storage.get(State, state.id,\n"
+                "                    options={'cities': 'joined'})\n"
+                "state.cities\n"
+                "counts.append(len(queries))\n"
+                "print(json.dumps([counts, sorted(state.to_dict())]))\n")
+        results = []
+        for n in [2, 6]:
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(os.environ, HBNB_TYPE_STORAGE="sqlite",
+                           HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"))
+                env.pop("HBNB_ENV", None)
+                result = subprocess.run(
+                    [sys.executable, "-c", code, str(n)], env=env,
+                    stdout=subprocess.PIPE, check=True, timeout=30)
+                results.append(json.loads(result.stdout.decode()))
+        (lazy, selectin, joined, nested, get), keys = results[0]
+        self.assertEqual(results[1][0][1:], [selectin, joined, nested, get])
+        self.assertGreater(results[1][0][0], lazy)
+        self.assertEqual([selectin, joined, nested, get], [2, 1, 3, 1])
+        self.assertEqual(keys, ["__class__", "created_at", "id", "name",
+                                "updated_at"])
+
+    def test_iter(self):
+        """Test that iter generates the objects of a class, and that the
+        list endpoints stream them"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from api.v1.app import app\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "for i in range(250):\n"
+                    "    storage.new(State(name=str(i)))\n"
+                    "storage.save()\n"
+                    "storage.close()\n"
+                    "names = [state.name for state in\n"
+                    "         storage.iter(State, batch_size=100)]\n"
+                    "response = app.test_client().get('/api/v1/states')\n"
+                    "result = [sorted(names, key=int),\n"
+                    "          len(list(storage.iter())),\n"
+                    "          response.is_streamed, response.get_json()]\n"
+                    "response.close()\n"
+                    "response = app.test_client().get('/api/v1/amenities')\n"
+                    "result.append(response.get_data(as_text=True))\n"
+                    "response.close()\n"
+                    "print(json.dumps(result))\n")
+            names, total, streamed, states, empty = run(
+                code, os.path.join(tmp, "hbnb.db"))
+            self.assertEqual(names, [str(i) for i in range(250)])
+            self.assertEqual(total, 250)
+            self.assertTrue(streamed)
+            self.assertEqual(sorted(state["name"] for state in states),
+                             sorted(names))
+            self.assertEqual(empty, "[]\n")
+
+    def test_bulk_new_and_update(self):
+        """Test that bulk_new and bulk_update write the rows of many
+        objects with one statement"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from sqlalchemy import event\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "from models.user import User\n"
+                    "queries = []\n"
+                    "event.listen(storage._DBStorage__engine,\n"
+                    "             'before_cursor_execute',\n"
+                    "             lambda *args: queries.append(args[2]))\n"
+                    "states = [State(name=str(i)) for i in range(50)]\n"
+                    "storage.bulk_new(states)\n"
+                    "inserts = len(queries)\n"
+                    "del queries[:]\n"
+                    "storage.bulk_update(State, [\n"
+                    "    {'id': state.id, 'name': 'x' + state.name,\n"
+                    "     'unknown': 1} for state in states[:20]] +\n"
+                    "    [{'id': 'missing', 'name': 'y'}])\n"
+                    "updates = len(queries)\n"
+                    "name = states[0].name\n"
+                    "storage.close()\n"
+                    "names = sorted(state.name for state in\n"
+                    "               storage.all(State).values())\n"
+                    "held = states[1].name\n"
+                    "user = User(email='a@b.c', password='pwd')\n"
+                    "storage.bulk_new([user])\n"
+                    "storage.bulk_update(User, [{'id': user.id,\n"
+                    "                            'password': 'new'}])\n"
+                    "storage.bulk_update('Unknown', [{'id': user.id}])\n"
+                    "storage.close()\n"
+                    "print(json.dumps([inserts, updates, name, names,\n"
+                    "                  held, user.password]))\n")
+            path = os.path.join(tmp, "hbnb.db")
+            inserts, updates, name, names, held, password = run(code, path)
+            self.assertEqual([inserts, updates, name], [1, 2, "x0"])
+            self.assertEqual(names, sorted(
+                ["x" + str(i) for i in range(20)] +
+                [str(i) for i in range(20, 50)]))
+            self.assertEqual(held, "x1")
+            digest = hashlib.md5(b"new").hexdigest()
+            self.assertEqual(password, digest)
+            with sqlite3.connect(path) as conn:
+                self.assertEqual(conn.execute(
+                    "SELECT password FROM users").fetchall(), [(digest,)])
+            conn.close()
+
+    def test_query_cache(self):
+        """Test that repeated queries are answered from the query cache
+        until a session commits changes to their tables"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from sqlalchemy import event\n"
+                    "from models import storage\n"
+                    "from models.city import City\n"
+                    "from models.state import State\n"
+                    "queries = []\n"
+                    "event.listen(storage._DBStorage__engine,\n"
+                    "             'before_cursor_execute',\n"
+                    "             lambda *args: queries.append(args[2]))\n"
+                    "state = State(name='Ohio')\n"
+                    "state.save()\n"
+                    "City(name='Akron', state_id=state.id).save()\n"
+                    "def read():\n"
+                    "    storage.close()\n"
+                    "    del queries[:]\n"
+                    "    names = sorted(state.name for state in\n"
+                    "                   storage.all(State).values())\n"
+                    "    ohio = storage.get(State, state.id,\n"
+                    "                       {'cities': 'selectin'})\n"
+                    "    result = [names, storage.count(State),\n"
+                    "              [city.name for city in ohio.cities],\n"
+                    "              len(queries)]\n"
+                    "    storage.close()\n"
+                    "    return result\n"
+                    "reads = [read(), read()]\n"
+                    "State(name='Utah').save()\n"
+                    "reads.append(read())\n"
+                    "storage.bulk_update(City, [{'id': ohio_city.id,\n"
+                    "                            'name': 'Dayton'}\n"
+                    "                           for ohio_city in\n"
+                    "                           storage.all(City).values()])\n"
+                    "reads.append(read())\n"
+                    "storage.new(State(name='Iowa'))\n"
+                    "reads.append(len(storage.all(State)))\n"
+                    "storage.close()\n"
+                    "reads.append(read())\n"
+                    "entries = storage.cache_stats()['entries']\n"
+                    "del queries[:]\n"
+                    "streamed = [state.name for state in\n"
+                    "            storage.iter(State)]\n"
+                    "reads.append([len(queries),\n"
+                    "              storage.cache_stats()['entries'] -\n"
+                    "              entries])\n"
+                    "print(json.dumps([reads, storage.cache_stats()]))\n")
+            reads, stats = run(code, os.path.join(tmp, "hbnb.db"),
+                               HBNB_DB_CACHE_SIZE="16")
+        self.assertEqual(reads[0][:3], [["Ohio"], 1, ["Akron"]])
+        self.assertGreater(reads[0][3], 0)
+        self.assertEqual(reads[1], [["Ohio"], 1, ["Akron"], 0])
+        self.assertEqual(reads[2][:3], [["Ohio", "Utah"], 2, ["Akron"]])
+        self.assertEqual(reads[3][:3], [["Ohio", "Utah"], 2, ["Dayton"]])
+        self.assertEqual(reads[4], 3)
+        self.assertEqual(reads[5], [["Ohio", "Utah"], 2, ["Dayton"], 0])
+        self.assertEqual(reads[6], [1, 0])
+        self.assertEqual(stats["size"], 16)
+        self.assertGreaterEqual(stats["hits"], 6)
+        self.assertGreater(stats["invalidations"], 0)
+
+    def test_object_cache(self):
+        """Test that get() rebuilds the objects of another session from
+        their snapshots until their rows are updated or deleted"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from sqlalchemy import event\n"
+                    "from models import storage\n"
+                    "from models.city import City\n"
+                    "from models.state import State\n"
+                    "queries = []\n"
+                    "event.listen(storage._DBStorage__engine,\n"
+                    "             'before_cursor_execute',\n"
+                    "             lambda *args: queries.append(args[2]))\n"
+                    "state = State(name='Ohio')\n"
+                    "state.save()\n"
+                    "City(name='Akron', state_id=state.id).save()\n"
+                    "def read():\n"
+                    "    storage.close()\n"
+                    "    del queries[:]\n"
+                    "    ohio = storage.get(State, state.id)\n"
+                    "    result = [ohio and ohio.name, len(queries)]\n"
+                    "    if ohio is not None:\n"
+                    "        result.append([city.name for city in\n"
+                    "                       ohio.cities])\n"
+                    "    return result\n"
+                    "reads = [read(), read()]\n"
+                    "reads[-1].append(storage.get(State, state.id).id)\n"
+                    "ohio = storage.get(State, state.id)\n"
+                    "ohio.name = 'Utah'\n"
+                    "reads.append(storage.get(State, state.id).name)\n"
+                    "storage.save()\n"
+                    "reads.append(read())\n"
+                    "storage.bulk_update(State, [{'id': state.id,\n"
+                    "                             'name': 'Iowa'}])\n"
+                    "reads.extend([read(), read()])\n"
+                    "storage.delete(storage.get(State, state.id))\n"
+                    "storage.save()\n"
+                    "reads.append(read())\n"
+                    "print(json.dumps([reads,\n"
+                    "                  storage.object_cache_stats()]))\n")
+            reads, stats = run(code, os.path.join(tmp, "hbnb.db"),
+                               HBNB_DB_OBJECT_CACHE_SIZE="16")
+        state_id = reads[1].pop()
+        self.assertEqual(reads[0], ["Ohio", 1, ["Akron"]])
+        self.assertEqual(reads[1], ["Ohio", 0, ["Akron"]])
+        self.assertEqual(len(state_id), 36)
+        self.assertEqual(reads[2], "Utah")
+        self.assertEqual(reads[3], ["Utah", 1, ["Akron"]])
+        self.assertEqual(reads[4], ["Iowa", 1, ["Akron"]])
+        self.assertEqual(reads[5], ["Iowa", 0, ["Akron"]])
+        self.assertEqual(reads[6], [None, 1])
+        self.assertEqual(stats["size"], 16)
+        self.assertGreaterEqual(stats["hits"], 2)
+
+    def test_replicas(self):
+        """Test that reads go to the replicas of HBNB_DB_REPLICAS, and to
+        the primary database after a write until the storage is closed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hbnb.db")
+            replica = os.path.join(tmp, "replica.db")
+            state_id = run("import json\n"
+                           "from models.state import State\n"
+                           "state = State(name='primary')\n"
+                           "state.save()\n"
+                           "print(json.dumps(state.id))\n", path)
+            source = sqlite3.connect(path)
+            with sqlite3.connect(replica) as conn:
+                source.backup(conn)
+                conn.execute("UPDATE states SET name = 'replica'")
+            conn.close()
+            source.close()
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "from models.state import State\n"
+                    "names = lambda: sorted(state.name for state in\n"
+                    "                       storage.all(State).values())\n"
+                    "seen = [names()]\n"
+                    "storage.new(State(name='new'))\n"
+                    "seen.append(names())\n"
+                    "storage.save()\n"
+                    "seen.append(names())\n"
+                    "storage.close()\n"
+                    "seen.append(names())\n"
+                    "state = storage.get(State, {!r})\n"
+                    "storage.delete(state)\n"
+                    "storage.save()\n"
+                    "seen.append(storage.count())\n"
+                    "storage.close()\n"
+                    "seen.append(storage.count())\n"
+                    "print(json.dumps(seen))\n").format(state_id)
+            self.assertEqual(
+                run(code, path, HBNB_DB_REPLICAS="sqlite:///" + replica),
+                [["replica"], ["new", "primary"], ["new", "primary"],
+                 ["replica"], 1, 1])
+
+    def test_indexes(self):
+        """Test that the frequent queries search the tables with their
+        indexes"""
+        code = ("import json\n"
+                "from sqlalchemy import event\n"
+                "from models import storage\n"
+                "from models.city import City\n"
+                "from models.place import Place\n"
+                "from models.review import Review\n"
+                "from models.state import State\n"
+                "State(name='Ohio').save()\n"
+                "engine = storage._DBStorage__engine\n"
+                "plans = {}\n"
+                "def explain(name, call, queries=None):\n"
+                "    if queries is None:\n"
+                "        queries = []\n"
+                "        listen = lambda conn, cursor, statement, params,\\\n"
+                "            *args: queries.append((statement, params))\n"
+                "        event.listen(engine, 'before_cursor_execute',\n"
+                "                     listen)\n"
+                "        call()\n"
+                "        storage.close()\n"
+                "        event.remove(engine, 'before_cursor_execute',\n"
+                "                     listen)\n"
+                "    with engine.connect() as conn:\n"
+                "        plans[name] = [\n"
+                "            row[3] for statement, params in queries\n"
+                "            for row in conn.exec_driver_sql(\n"
+                "                'EXPLAIN QUERY PLAN ' + statement, params)]\n"
+                "for cls, fk in [(City, 'state_id'), (Place, 'city_id'),\n"
+                "                (Review, 'place_id'), (Review, 'user_id')]:\n"
+                "    explain(fk, lambda: storage.children(cls, fk, 'id'))\n"
+                "explain('amenities', lambda: storage.search_places(\n"
+                "    None, None, ['wifi', 'tv']))\n"
+                "explain('cities', lambda: [state.cities for state in\n"
+                "                           storage.all(State).values()])\n"
+                "explain('email', None, [\n"
+                "    ('SELECT id FROM users WHERE email = ?', ('a@b.c',))])\n"
+                "explain('name', None, [\n"
+                "    ('SELECT id FROM states ORDER BY name', ())])\n"
+                "print(json.dumps(plans))\n")
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_TYPE_STORAGE="sqlite",
+                       HBNB_SQLITE_DB=os.path.join(tmp, "hbnb.db"))
+            env.pop("HBNB_ENV", None)
+            result = subprocess.run([sys.executable, "-c", code], env=env,
+                                    stdout=subprocess.PIPE, check=True,
+                                    timeout=30)
+            plans = json.loads(result.stdout.decode())
+        for name, index in [("state_id", "ix_cities_state_id_name"),
+                            ("city_id", "ix_places_city_id"),
+                            ("user_id", "ix_reviews_user_id"),
+                            ("place_id", "ix_reviews_place_id"),
+                            ("amenities", "ix_place_amenity_amenity_id"),
+                            ("cities", "ix_cities_state_id_name"),
+                            ("email", "ix_users_email"),
+                            ("name", "ix_states_name")]:
+            with self.subTest(query=name):
+                self.assertTrue(any(index in step for step in plans[name]),
+                                plans[name])
+
+    def test_add_indexes(self):
+        """Test that add_indexes creates the indexes a database lacks"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hbnb.db")
+            run("import json\n"
+                "from models import storage\n"
+                "print(json.dumps(None))\n", path)
+            with sqlite3.connect(path) as conn:
+                conn.execute("DROP INDEX ix_states_name")
+                conn.execute("DROP INDEX ix_cities_state_id_name")
+            conn.close()
+            code = ("import json\n"
+                    "from models import storage\n"
+                    "print(json.dumps([storage.add_indexes(),\n"
+                    "                  storage.add_indexes()]))\n")
+            self.assertEqual(run(code, path), [
+                ["ix_states_name", "ix_cities_state_id_name"], []])
+
+    def test_delete_cascade(self):
+        """Test that deleting a state deletes its cities, their places and
+        the reviews of those in the database, without loading them, and
+        that the cached results of their tables are dropped"""
+        with tempfile.TemporaryDirectory() as tmp:
+            code = ("import json\n"
+                    "from sqlalchemy import event\n"
+                    "from models import storage\n"
+                    "from models.city import City\n"
+                    "from models.place import Place\n"
+                    "from models.review import Review\n"
+                    "from models.state import State\n"
+                    "from models.user import User\n"
+                    "queries = []\n"
+                    "event.listen(storage._DBStorage__engine,\n"
+                    "             'before_cursor_execute',\n"
+                    "             lambda *args: queries.append(args[2]))\n"
+                    "ohio = State(name='Ohio')\n"
+                    "utah = State(name='Utah')\n"
+                    "akron = City(name='Akron', state_id=ohio.id)\n"
+                    "provo = City(name='Provo', state_id=utah.id)\n"
+                    "user = User(email='a@b.c', password='pwd')\n"
+                    "chalet = Place(name='Chalet', city_id=akron.id,\n"
+                    "               user_id=user.id)\n"
+                    "cabin = Place(name='Cabin', city_id=provo.id,\n"
+                    "              user_id=user.id)\n"
+                    "storage.bulk_new([ohio, utah, akron, provo, user,\n"
+                    "                  chalet, cabin,\n"
+                    "                  Review(text='Nice', user_id=user.id,\n"
+                    "                         place_id=chalet.id),\n"
+                    "                  Review(text='Cosy', user_id=user.id,\n"
+                    "                         place_id=cabin.id)])\n"
+                    "def names():\n"
+                    "    storage.close()\n"
+                    "    return [sorted(obj.name if cls is not Review\n"
+                    "                   else obj.text\n"
+                    "                   for obj in storage.iter(cls))\n"
+                    "            for cls in [State, City, Place, Review]]\n"
+                    "before = names()\n"
+                    "storage.close()\n"
+                    "ohio = storage.get(State, ohio.id)\n"
+                    "del queries[:]\n"
+                    "storage.delete(ohio)\n"
+                    "storage.save()\n"
+                    "deleting = len(queries)\n"
+                    "print(json.dumps([before, deleting, names()]))\n")
+            for environ in [{}, {"HBNB_DB_CACHE_SIZE": "16",
+                                 "HBNB_DB_OBJECT_CACHE_SIZE": "16"}]:
+                with self.subTest(**environ):
+                    path = os.path.join(tmp, str(len(environ)) + ".db")
+                    before, deleting, after = run(code, path, **environ)
+                    self.assertEqual(before, [["Ohio", "Utah"],
+                                              ["Akron", "Provo"],
+                                              ["Cabin", "Chalet"],
+                                              ["Cosy", "Nice"]])
+                    self.assertEqual(deleting, 1)
+                    self.assertEqual(after, [["Utah"], ["Provo"], ["Cabin"],
+                                             ["Cosy"]])
+
+    def test_add_cascades(self):
+        """Test that add_cascades makes the foreign keys of an existing
+        table delete on cascade, keeping its rows and indexes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hbnb.db")
+            run("import json\n"
+                "from models import storage\n"
+                "from models.city import City\n"
+                "from models.state import State\n"
+                "state = State(name='Ohio')\n"
+                "storage.bulk_new([state,\n"
+                "                  City(name='Akron', state_id=state.id)])\n"
+                "print(json.dumps(None))\n", path)
+            with sqlite3.connect(path) as conn:
+                sql = conn.execute("SELECT sql FROM sqlite_master WHERE "
+                                   "name = 'cities'").fetchone()[0]
+                conn.execute("PRAGMA foreign_keys = OFF")
+                conn.execute(sql.replace(" ON DELETE CASCADE", "")
+                             .replace("cities", "old_cities", 1))
+                conn.execute("INSERT INTO old_cities SELECT * FROM cities")
+                conn.execute("DROP TABLE cities")
+                conn.execute("ALTER TABLE old_cities RENAME TO cities")
+            conn.close()
+            code = ("import json\n"
+                    "from sqlalchemy import inspect\n"
+                    "from models import storage\n"
+                    "from models.city import City\n"
+                    "inspector = inspect(storage._DBStorage__engine)\n"
+                    "print(json.dumps([\n"
+                    "    storage.add_indexes(), storage.add_cascades(),\n"
+                    "    storage.add_cascades(),\n"
+                    "    [fk['options'] for fk in\n"
+                    "     inspector.get_foreign_keys('cities')],\n"
+                    "    [city.name for city in storage.iter(City)]]))\n")
+            self.assertEqual(run(code, path), [
+                ["ix_cities_state_id_name"], ["cities"], [],
+                [{"ondelete": "CASCADE"}], ["Akron"]])
+            with sqlite3.connect(path) as conn:
+                conn.execute("PRAGMA foreign_keys = ON")
+                conn.execute("DELETE FROM states")
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM cities")
+                                 .fetchone()[0], 0)
+                self.assertIn(("ix_cities_state_id_name",), conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"))
+            conn.close()